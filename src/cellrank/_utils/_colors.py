@@ -212,13 +212,15 @@ def _map_names_and_colors(
     # create dataframe to store the associations between reference and query
     cats_query = series_query.cat.categories
     cats_reference = series_reference.cat.categories
-    association_df = pd.DataFrame(None, index=cats_query, columns=cats_reference)
 
-    # populate the dataframe - compute the overlap
-    for cl in cats_query:
-        row = [np.sum(series_reference.loc[np.array(series_query == cl)] == key) for key in cats_reference]
-        association_df.loc[cl] = row
-    association_df = association_df.apply(pd.to_numeric)
+    # populate the dataframe - compute the overlap on the integer codes, `NaN` has code `-1`
+    codes_query, codes_reference = series_query.cat.codes.to_numpy(), series_reference.cat.codes.to_numpy()
+    mask = (codes_query >= 0) & (codes_reference >= 0)
+    overlap = np.bincount(
+        codes_query[mask].astype(np.int64) * len(cats_reference) + codes_reference[mask],
+        minlength=len(cats_query) * len(cats_reference),
+    ).reshape(len(cats_query), len(cats_reference))
+    association_df = pd.DataFrame(overlap, index=cats_query, columns=cats_reference)
 
     # find the mapping which maximizes overlap
     names_query = association_df.T.idxmax()
@@ -176,9 +176,9 @@ tol
     Convergence tolerance for the iterative solver. The default is fine for most cases, only consider
     decreasing this for severely ill-conditioned matrices.
 preconditioner
-    Preconditioner to use, only available when ``use_petsc = True``. For valid options, see
-    `here <https://petsc.org/release/docs/manual/ksp/?highlight=pctype#preconditioners>`__.
-    We recommend the ``'ilu'`` preconditioner for badly conditioned problems."""
+    Preconditioner to use. When ``use_petsc = True``, for valid options, see
+    `here <https://petsc.org/release/docs/manual/ksp/?highlight=pctype#preconditioners>`__,
+    otherwise only ``'ilu'`` is supported. We recommend the ``'ilu'`` preconditioner for badly conditioned problems."""
 which = """\
 which
     Whether to compute initial or terminal states."""
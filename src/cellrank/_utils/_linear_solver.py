@@ -185,12 +185,49 @@ def _(
     return np.stack(xs, axis=1), converged
 
 
+class _EyeMinusOperator(sp.linalg.LinearOperator):
+    """Linear operator representing ``I - mat_a`` without materializing it.
+
+    Parameters
+    ----------
+    mat_a
+        Matrix of shape `n x n`.
+    """
+
+    def __init__(self, mat_a: sp.spmatrix):
+        super().__init__(dtype=mat_a.dtype, shape=mat_a.shape)
+        self._mat_a = mat_a
+
+    def _matvec(self, x: np.ndarray) -> np.ndarray:
+        return x - self._mat_a @ x
+
+    def _rmatvec(self, x: np.ndarray) -> np.ndarray:
+        return x - self._mat_a.T @ x
+
+
+def _ilu_preconditioner(mat_a: sp.spmatrix) -> sp.linalg.LinearOperator:
+    """Create an incomplete LU preconditioner.
+
+    Parameters
+    ----------
+    mat_a
+        Matrix of shape `n x n`.
+
+    Returns
+    -------
+    Linear operator approximating the inverse of ``mat_a``.
+    """
+    ilu = sp.linalg.spilu(sp.csc_matrix(mat_a), drop_tol=1e-4, fill_factor=10)
+    return sp.linalg.LinearOperator(mat_a.shape, matvec=ilu.solve, dtype=ilu.L.dtype)
+
+
 def _solve_many_sparse_problems(
     mat_b: sp.spmatrix,
-    mat_a: sp.spmatrix,
+    mat_a: Union[sp.spmatrix, sp.linalg.LinearOperator],
     solver: LinSolver,
     tol: float,
     queue: Queue,
+    preconditioner: Optional[Union[str, sp.linalg.LinearOperator]] = None,
 ) -> Tuple[np.ndarray, int]:
     """Solve ``mat_a * x = mat_b`` efficiently using an iterative solver.
 
@@ -203,13 +240,17 @@ def _solve_many_sparse_problems(
     mat_b
         Matrix of shape `n x m`, with m << n.
     mat_a
-        Matrix of shape `n x n`. We make no assumptions on `mat_a` being symmetric or positive definite.
+        Matrix or a linear operator of shape `n x n`.
+        We make no assumptions on `mat_a` being symmetric or positive definite.
     solver
         Solver to use for the linear problem. Valid options can be found in :func:`scipy.sparse.linalg`.
     tol
         The relative convergence tolerance, relative decrease in the (possibly preconditioned) residual norm .
     queue
         Queue used to signal when a solution has been computed.
+    preconditioner
+        Preconditioner to use. Either an already created one or ``'ilu'``, in which case ``mat_a``
+        must be a matrix.
 
     Returns
     -------
@@ -221,10 +262,15 @@ def _solve_many_sparse_problems(
     # initialise solution list and info list
     x_list, n_converged = [], 0
     kwargs = {} if solver is not sp.linalg.gmres else {"atol": "legacy"}  # get rid of the warning
+    if isinstance(preconditioner, str) and preconditioner == "ilu":
+        # factorize once per chunk, reused for all of its sub-problems
+        preconditioner = _ilu_preconditioner(mat_a)
+    if preconditioner is not None:
+        kwargs["M"] = preconditioner
 
     for b in mat_b:
         # actually call the solver for the current sub-problem
-        x, info = solver(mat_a, b.toarray().flatten(), tol=tol, x0=None, **kwargs)
+        x, info = solver(mat_a, b.toarray().ravel(), tol=tol, x0=None, **kwargs)
 
         # append solution and info
         x_list.append(np.atleast_1d(x))
@@ -335,9 +381,8 @@ def _solve_lin_system(
     and columns in ``mat_b`` being related. In that case, we can treat each column of ``mat_b`` as a
     separate linear problem and solve that efficiently using iterative solvers that exploit sparsity.
 
-    If the columns of ``mat_b`` are related, we can use the solution of the previous problem as an
-    initial guess for the next problem. Further, we parallelize the individual problems for each
-    column in ``mat_b`` and solve them on separate kernels.
+    The individual problems for each column in ``mat_b`` are independent of each other, i.e. no solution
+    is used as an initial guess for the next one, and they are solved in parallel on separate kernels.
 
     In case ``mat_a`` is either not sparse, or very small, or ``mat_b`` has very many columns, it makes
     sense to use a direct solver instead which computes a matrix factorization and thereby solves all
@@ -358,9 +403,10 @@ def _solve_lin_system(
     use_petsc
         Whether to use solvers from :mod:`petsc4py` instead of :mod:`scipy`. Recommended for large problems.
     preconditioner
-        Preconditioner to use when ``use_petsc=True``. For available preconditioners, see `petsc4py.PETSc.PC.Type`.
+        Preconditioner to use. When ``use_petsc=True``, see `petsc4py.PETSc.PC.Type` for available preconditioners,
+        otherwise only ``'ilu'`` is supported for the iterative solvers.
     n_jobs
-        Number of parallel jobs to use when ``use_petsc=True``. For small, quickly-solvable problems,
+        Number of parallel jobs to use for the iterative solvers. For small, quickly-solvable problems,
         we recommend high number (>=8) of cores in order to fully saturate them.
     backend
         Which backend to use for multiprocessing. See :class:`joblib.Parallel` for valid options.
@@ -391,8 +437,15 @@ def _solve_lin_system(
         solver = _DEFAULT_SOLVER
         use_petsc = False
 
-    if use_eye:
+    if not use_petsc and solver in _AVAIL_ITER_SOLVERS and preconditioner not in (None, "ilu"):
+        logg.warning(f"Preconditioner `{preconditioner!r}` is not supported by `scipy` solvers, ignoring")
+        preconditioner = None
+
+    # `scipy`'s iterative solvers only need matrix-vector products, no need to materialize `I - A`
+    # unless the matrix needs to be factorized for the preconditioner
+    if use_eye and (use_petsc or solver not in _AVAIL_ITER_SOLVERS or preconditioner is not None):
         mat_a = (sp.eye(mat_a.shape[0]) if sp.issparse(mat_a) else np.eye(mat_a.shape[0])) - mat_a
+        use_eye = False
 
     if solver == "direct":
         if use_petsc:
@@ -439,6 +492,8 @@ def _solve_lin_system(
         if not sp.issparse(mat_a):
             logg.debug("Sparsifying `A` for iterative solver")
             mat_a = sp.csr_matrix(mat_a)
+        if use_eye:
+            mat_a = _EyeMinusOperator(mat_a)
 
         mat_b = mat_b.T
         if not sp.issparse(mat_b):
@@ -446,8 +501,12 @@ def _solve_lin_system(
             mat_b = sp.csr_matrix(mat_b)
 
         logg.debug(
-            f"Solving the linear system using `scipy` solver `{solver!r}` on `{n_jobs} cores(s)` with `tol={tol}`"
+            f"Solving the linear system using `scipy` solver `{solver!r}` on `{n_jobs} cores(s)` with "
+            f"{'no' if preconditioner is None else preconditioner} preconditioner and `tol={tol}`"
         )
+        if preconditioner == "ilu" and (backend in ("threading", "sequential") or min(n_jobs, mat_b.shape[0]) == 1):
+            # `SuperLU` can't be pickled, factorize only once if all jobs share the memory
+            preconditioner = _ilu_preconditioner(mat_a)
 
         mat_x, n_converged = parallelize(
             _solve_many_sparse_problems,
@@ -457,7 +516,7 @@ def _solve_lin_system(
             as_array=False,
             extractor=extractor,
             show_progress_bar=show_progress_bar,
-        )(mat_a, solver=_AVAIL_ITER_SOLVERS[solver], tol=tol)
+        )(mat_a, solver=_AVAIL_ITER_SOLVERS[solver], tol=tol, preconditioner=preconditioner)
 
     else:
         raise ValueError(f"Invalid solver `{solver!r}`.")
@@ -1,4 +1,5 @@
 import multiprocessing
+import queue as queue_
 import threading
 from typing import Any, Callable, Optional, Sequence, Union
 
@@ -18,7 +19,7 @@ def parallelize(
     unit: str = "",
     as_array: bool = True,
     use_ixs: bool = False,
-    backend: str = "loky",
+    backend: Optional[str] = None,
     extractor: Optional[Callable[[Any], Any]] = None,
     show_progress_bar: bool = True,
 ) -> Any:
@@ -42,6 +43,8 @@ def parallelize(
         Whether to pass indices to the callback.
     backend
         Which backend to use for multiprocessing. See :class:`joblib.Parallel` for valid options.
+        If `None`, use `'threading'` for :mod:`numba`-compiled callbacks which release the GIL,
+        i.e., were compiled with ``nogil=True``, and `'loky'` otherwise.
     extractor
         Function to apply to the result after all jobs have finished.
     show_progress_bar
@@ -87,7 +90,8 @@ def parallelize(
     def wrapper(*args, **kwargs):
         if pass_queue and show_progress_bar:
             pbar = None if tqdm is None else tqdm(total=col_len, unit=unit, mininterval=0.125)
-            queue = multiprocessing.Manager().Queue()
+            # a manager spawns a server process, only needed if the jobs don't share our memory
+            queue = multiprocessing.Manager().Queue() if use_processes else queue_.Queue()
             thread = threading.Thread(target=update, args=(pbar, queue, len(collections)))
             thread.start()
         else:
@@ -116,20 +120,21 @@ def parallelize(
 
     if sp.issparse(collection):
         n_split = max(1, min(n_split, collection.shape[0]))
-        if n_split == collection.shape[0]:
-            collections = [collection[[ix], :] for ix in range(collection.shape[0])]
-        else:
-            step = collection.shape[0] // n_split
-            ixs = [np.arange(i * step, min((i + 1) * step, collection.shape[0])) for i in range(n_split)]
-            ixs[-1] = np.append(ixs[-1], np.arange(ixs[-1][-1] + 1, collection.shape[0]))
-
-            collections = [collection[ix, :] for ix in filter(len, ixs)]
+        # contiguous row slices only copy the relevant part of `indptr`, `indices` and `data`
+        step = collection.shape[0] // n_split
+        bounds = [i * step for i in range(n_split)] + [collection.shape[0]]
+        collections = [collection[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
     else:
         collections = list(filter(len, np.array_split(collection, n_split)))
 
     n_split = len(collections)
     n_jobs = min(n_jobs, n_split)
     pass_queue = not hasattr(callback, "py_func")  # we'd be inside a numba function
+    if backend is None:
+        # compiled callbacks which hold the GIL would be serialized on threads
+        releases_gil = not pass_queue and getattr(callback, "targetoptions", {}).get("nogil", False)
+        backend = "threading" if releases_gil else "loky"
+    use_processes = n_jobs > 1 and backend not in ("threading", "sequential")
 
     return wrapper
 
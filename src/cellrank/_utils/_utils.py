@@ -1,3 +1,4 @@
+import collections
 import contextlib
 import functools
 import inspect
@@ -5,6 +6,7 @@ import itertools
 import os
 import types
 import warnings
+import weakref
 from typing import (
     Any,
     Callable,
@@ -53,6 +55,11 @@ DiGraph = TypeVar("DiGraph")
 
 EPS = np.finfo(np.float64).eps
 
+# KNN connectivities used for clustering, keyed by the `id` of the data and the number of neighbors
+# an entry is removed as soon as its data is garbage collected
+_KNN_CACHE: "collections.OrderedDict[Tuple[int, int], sp.csr_matrix]" = collections.OrderedDict()
+_KNN_CACHE_SIZE = 4
+
 
 class TestMethod(ModeEnum):
     FISHER = "fisher"
@@ -278,7 +285,11 @@ def _complex_warning(X: np.array, use: Union[list, int, tuple, range], use_imag:
     -------
     An array containing either only real eigenvectors or also complex ones.
     """
-    complex_mask = np.sum(X.imag != 0, axis=0) > 0
+    if not np.iscomplexobj(X):
+        # `X.imag` would allocate an array of zeros
+        return X
+
+    complex_mask = np.any(X.imag != 0, axis=0)
     complex_ixs = np.array(use)[np.where(complex_mask)[0]]
     complex_key = "imaginary" if use_imag else "real"
     if len(complex_ixs) > 0:
@@ -534,22 +545,26 @@ def _filter_cells(distances: sp.spmatrix, rc_labels: pd.Series, n_matches_min: i
         raise TypeError(f"Expected `categories` be `categorical`, found `{infer_dtype(rc_labels)}`.")
 
     # retrieve knn graph
-    rows, cols = distances.nonzero()
-    cls = rc_labels.cat.categories
-    freqs_orig = np.array([np.sum(rc_labels == cl) for cl in cls])
+    distances = sp.csr_matrix(distances, copy=True)
+    distances.eliminate_zeros()
+    indptr, indices = distances.indptr, distances.indices
+
+    n_cls = len(rc_labels.cat.categories)
+    codes = rc_labels.cat.codes.to_numpy(copy=True)
+    freqs_orig = np.bincount(codes[codes >= 0], minlength=n_cls)
 
     # loop over cells and check whether they have neighbors from the same class
-    for cl in cls:
-        cells = np.where(rc_labels == cl)[0]
-        for cell in cells:
-            own_cl = rc_labels[cell]
-            neighbors = cols[rows == cell]
-            n_cls = rc_labels[neighbors]
-            n_matches = np.sum(np.in1d(n_cls, own_cl))
-            if n_matches < n_matches_min:
-                rc_labels[cell] = None
-
-    freqs_new = np.array([np.sum(rc_labels == cl) for cl in cls])
+    # cells which have already been filtered out no longer count as matching neighbors
+    for cl in range(n_cls):
+        for cell in np.where(codes == cl)[0]:
+            neighbors = indices[indptr[cell] : indptr[cell + 1]]
+            if np.sum(codes[neighbors] == cl) < n_matches_min:
+                codes[cell] = -1
+
+    freqs_new = np.bincount(codes[codes >= 0], minlength=n_cls)
+    rc_labels = pd.Series(
+        pd.Categorical.from_codes(codes, dtype=rc_labels.dtype), index=rc_labels.index, name=rc_labels.name
+    )
 
     if np.any((freqs_new / freqs_orig) < 0.5):
         logg.warning(
@@ -560,6 +575,50 @@ def _filter_cells(distances: sp.spmatrix, rc_labels: pd.Series, n_matches_min: i
     return rc_labels
 
 
+def _knn_connectivities(X: Union[np.ndarray, sp.spmatrix], n_neighbors: int) -> sp.csr_matrix:
+    """Compute the KNN connectivities of the rows of ``X``.
+
+    The graphs of the last few objects are cached for as long as these objects are alive, since clustering
+    the same data with different parameters would otherwise repeat the neighbor search. In-place modifications
+    of ``X`` are not detected. A copy is returned, so the cached graph is never modified.
+
+    Parameters
+    ----------
+    X
+        Matrix of shape ``n_samples x n_features``.
+    n_neighbors
+        Number of neighbors for KNN construction.
+
+    Returns
+    -------
+    The connectivities of shape ``n_samples x n_samples``.
+    """
+    key = (id(X), n_neighbors)
+    if key in _KNN_CACHE:
+        _KNN_CACHE.move_to_end(key)
+        return _KNN_CACHE[key].copy()
+
+    adata_dummy = sc.AnnData(X=X)
+    sc.pp.neighbors(adata_dummy, use_rep="X", n_neighbors=n_neighbors)
+    conn = adata_dummy.obsp["connectivities"]
+
+    try:
+        # `id` can be reused after `X` is collected, the entry must not outlive it
+        weakref.finalize(X, _KNN_CACHE.pop, key, None)
+    except TypeError:
+        return conn
+    _KNN_CACHE[key] = conn
+    if len(_KNN_CACHE) > _KNN_CACHE_SIZE:
+        _KNN_CACHE.popitem(last=False)
+
+    return conn.copy()
+
+
+def _clear_knn_cache() -> None:
+    """Remove all KNN connectivities cached by :func:`_knn_connectivities`."""
+    _KNN_CACHE.clear()
+
+
 def _cluster_X(
     X: Union[np.ndarray, sp.spmatrix],
     n_clusters: int,
@@ -591,12 +650,16 @@ def _cluster_X(
         return [0]
 
     if method == "kmeans":
-        kmeans = KMeans(n_clusters=n_clusters).fit(X)
-        labels = kmeans.labels_
+        if not sp.issparse(X):
+            # `sklearn` computes the distances via GEMM, single precision is sufficient for few clusters
+            # and avoids an internal copy of non-contiguous arrays
+            X = np.ascontiguousarray(X, dtype=np.float32)
+        # `k-means++` seeding in `sklearn` keeps a running minimum of the squared distances, no Python loops
+        labels = KMeans(n_clusters=n_clusters, init="k-means++").fit_predict(X)
     elif method == "leiden":
         adata_dummy = sc.AnnData(X=X)
-        sc.pp.neighbors(adata_dummy, use_rep="X", n_neighbors=n_neighbors)
-        sc.tl.leiden(adata_dummy, resolution=resolution)
+        conn = _knn_connectivities(X, n_neighbors=n_neighbors)
+        sc.tl.leiden(adata_dummy, resolution=resolution, adjacency=conn)
         labels = adata_dummy.obs[method]
     else:
         raise NotImplementedError(f"Invalid method `{method}`. Valid options are `kmeans` or `leiden`.")
@@ -852,7 +915,7 @@ def save_fig(fig, path: Union[str, os.PathLike], make_dir: bool = True, ext: str
 
 
 def _convert_to_categorical_series(
-    term_states: Dict[Union[int, str], Sequence[Union[int, str]]], cell_names: List[str]
+    term_states: Dict[Union[int, str], Sequence[Union[int, str]]], cell_names: Sequence[str]
 ) -> pd.Series:
     """Convert a mapping of terminal states to cells to a :class:`~pandas.Series`.
 
@@ -860,24 +923,35 @@ def _convert_to_categorical_series(
     ----------
     term_states
         Terminal states in the following format: `{'state_0': ['cell_0', 'cell_1', ...], ...}`.
+        Cells can also be specified by their indices or by a boolean mask over ``cell_names``.
     cell_names
-        List of valid cell names, usually taken from :attr:`~anndata.AnnData.obs_names`.
+        Valid cell names, usually taken from :attr:`~anndata.AnnData.obs_names`.
 
     Returns
     -------
     Categorical series where `NaN` mark cells which do not belong to any recurrent class.
     """
-    cnames = set(cell_names)
+    cell_names = pd.Index(cell_names)
     mapper, expected_size = {}, 0
     for ts, cells in term_states.items():
+        if isinstance(cells, (np.ndarray, pd.Series)) and cells.dtype == bool:
+            if len(cells) != len(cell_names):
+                raise ValueError(f"Expected boolean mask of length `{len(cell_names)}`, found `{len(cells)}`.")
+            cells = np.flatnonzero(cells)
         if not len(cells):
             logg.warning(f"No cells selected for category `{ts!r}`. Skipping")
             continue
-        cells = [c if isinstance(c, str) else cell_names[c] for c in cells]
-        rest = set(cells) - cnames
-        if rest:
-            raise ValueError(f"Invalid cell names `{list(rest)}`.")
-        mapper[str(ts)] = cells
+        cells = pd.Index(cells)
+        if cells.inferred_type == "integer":
+            ixs = np.arange(len(cell_names))[np.asarray(cells)]
+        else:
+            if cells.inferred_type == "mixed-integer":
+                cells = pd.Index([c if isinstance(c, str) else cell_names[c] for c in cells])
+            mask = cells.isin(cell_names)
+            if not np.all(mask):
+                raise ValueError(f"Invalid cell names `{list(cells[~mask])}`.")
+            ixs = cell_names.get_indexer_for(cells)
+        mapper[str(ts)] = ixs
         expected_size += 1
 
     if len(mapper) != expected_size:
@@ -886,11 +960,14 @@ def _convert_to_categorical_series(
             "that there are no conflicting keys, such as `0` and `'0'`."
         )
 
-    term_states = pd.Series([np.nan] * len(cell_names), index=cell_names)
-    for ts, cells in mapper.items():
-        term_states[cells] = ts
+    categories = sorted(mapper.keys())
+    codes = np.full(len(cell_names), fill_value=-1, dtype=np.int32)
+    # later states overwrite the cells of the earlier ones
+    for ts, ixs in mapper.items():
+        codes[ixs] = categories.index(ts)
 
-    term_states = term_states.astype("category")
+    term_states = pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=cell_names)
+    term_states = term_states.cat.remove_unused_categories()
     if not len(term_states.cat.categories):
         raise ValueError("No categories have been selected.")
 
@@ -956,14 +1033,14 @@ def _merge_categorical_series(
     if (old.index != new.index).any():
         raise ValueError("Index for old and new approx. recurrent classes differ.")
 
-    old, new = old.copy(), new.copy()
-    mask = ~new.isna()
-    if np.sum(mask) == 0:
-        return old
+    new_codes = new.cat.codes.to_numpy()
+    mask = new_codes >= 0
+    if not np.any(mask):
+        return old.copy()
 
     old_cats = old.cat.categories
     new_cats = new.cat.categories
-    cats_to_add = pd.CategoricalIndex(new.loc[mask]).remove_unused_categories().categories
+    cats_to_add = new_cats[np.unique(new_codes[mask])]
 
     if not colors_old and colors_new:
         colors_old = _insert_categorical_colors(
@@ -985,8 +1062,11 @@ def _merge_categorical_series(
     old = old.cat.set_categories(tmp)
     new = new.cat.set_categories(tmp)
 
-    old.loc[mask] = new.loc[mask]
-    old = old.cat.remove_unused_categories()
+    # merge on the codes, both series now share the same categories
+    codes = np.where(mask, new.cat.codes.to_numpy(), old.cat.codes.to_numpy())
+    old = pd.Series(
+        pd.Categorical.from_codes(codes, dtype=old.dtype), index=old.index, name=old.name
+    ).cat.remove_unused_categories()
 
     if not colors_old and not colors_new:
         return old
@@ -1079,26 +1159,22 @@ def _fuzzy_to_discrete(
     n_raise = 1 if raise_threshold is None else np.max([int(raise_threshold * n_most_likely), 1])
     logg.debug(f"Raising an exception if there are less than `{n_raise}` cells.")
 
-    # initially select `n_most_likely` samples per cluster
-    sample_assignment = {
-        cl: fuzzy_assignment.argpartition(-n_most_likely)[-n_most_likely:]
-        for cl, fuzzy_assignment in enumerate(a_fuzzy.T)
-    }
+    # initially select `n_most_likely` samples per cluster, shape `(n_most_likely, n_clusters)`
+    sample_assignment = np.argpartition(a_fuzzy, -n_most_likely, axis=0)[-n_most_likely:]
 
     # create the one-hot encoded discrete clustering
     a_discrete = np.zeros(a_fuzzy.shape, dtype=bool)  # don't use `zeros_like` - it also copies the dtype
-    for ix in range(n_clusters):
-        a_discrete[sample_assignment[ix], ix] = True
+    a_discrete[sample_assignment, np.arange(n_clusters)] = True
 
     # handle samples assigned to more than one cluster
     critical_samples = np.where(a_discrete.sum(1) > 1)[0]
-    for sample_ix in critical_samples:
-        if remove_overlap:
-            a_discrete[sample_ix, :] = _one_hot(n_clusters)
-        else:
-            candidate_ixs = np.where(a_discrete[sample_ix, :])[0]
-            most_likely_ix = candidate_ixs[np.argmax(a_fuzzy[sample_ix, list(a_discrete[sample_ix, :])])]
-            a_discrete[sample_ix, :] = _one_hot(n_clusters, most_likely_ix)
+    if len(critical_samples):
+        candidates = a_discrete[critical_samples]
+        a_discrete[critical_samples] = False
+        if not remove_overlap:
+            # assign to the most likely cluster among the candidates
+            most_likely_ixs = np.where(candidates, a_fuzzy[critical_samples], -np.inf).argmax(1)
+            a_discrete[critical_samples, most_likely_ixs] = True
 
     # check how many samples this left for each cluster
     n_samples_per_cluster = a_discrete.sum(0)
@@ -1522,6 +1598,36 @@ def _densify_squeeze(x: Union[sp.spmatrix, np.ndarray], dtype=np.float32) -> np.
     return x
 
 
+def _make_index_unique(index: Union[pd.Index, pd.Series], join: str = "-") -> pd.Index:
+    """Vectorized version of :func:`anndata.utils.make_index_unique` for string indices.
+
+    Parameters
+    ----------
+    index
+        Index to make unique.
+    join
+        Separator between the name and the number of its previous occurrences.
+
+    Returns
+    -------
+    The unique index.
+    """
+    index = pd.Index(index)
+    if index.is_unique:
+        return index
+    if infer_dtype(index) != "string":
+        return make_index_unique(index, join=join)
+
+    values = pd.Series(np.asarray(index, dtype=object))
+    counts = values.groupby(values.to_numpy(), sort=False).cumcount()
+    dups = (counts > 0).to_numpy()
+    values[dups] = values[dups] + join + counts[dups].astype(str)
+
+    res = pd.Index(values.to_numpy(), name=index.name)
+    # the suffixed names can collide with the existing ones, let `anndata` resolve these
+    return res if res.is_unique else make_index_unique(index, join=join)
+
+
 @contextlib.contextmanager
 @d.dedent
 def _gene_symbols_ctx(
@@ -1564,10 +1670,11 @@ def _gene_symbols_ctx(
         if use_raw:
             adata = adata.raw
 
-        var_names = adata.var_names.copy()
+        # indices are immutable, it's sufficient to keep a reference to the original one
+        var_names = adata.var_names
         try:
             # TODO(michalk8): doesn't update varm (niche)
-            adata.var.index = make_index_unique(adata.var[key]) if make_unique else adata.var[key]
+            adata.var.index = _make_index_unique(adata.var[key]) if make_unique else adata.var[key]
             yield adata_orig
         finally:
             # in principle we assume the callee doesn't change the index
@@ -1,4 +1,5 @@
 import enum
+import functools
 import os
 import pathlib
 from typing import Any, Literal, Tuple, Union
@@ -41,8 +42,19 @@ _datasets = {
 # fmt: on
 
 
+# only used with `in_memory=True`, holds the most recently read dataset until `_read_cached.cache_clear()`
+@functools.lru_cache(maxsize=1)
+def _read_cached(fpath: str, mtime: float, **kwargs: Any) -> AnnData:
+    # `mtime` is part of the key so that the cache is invalidated when the file changes
+    return read(fpath, **kwargs)
+
+
 def _load_dataset_from_url(
-    fpath: Union[str, pathlib.Path], url: str, expected_shape: Tuple[int, int], **kwargs: Any
+    fpath: Union[str, pathlib.Path],
+    url: str,
+    expected_shape: Tuple[int, int],
+    in_memory: bool = False,
+    **kwargs: Any,
 ) -> AnnData:
     fpath = str(fpath)
     if not fpath.endswith(".h5ad"):
@@ -64,7 +76,19 @@ def _load_dataset_from_url(
     kwargs.setdefault("sparse", True)
     kwargs.setdefault("cache", True)
 
-    adata = read(fpath, backup_url=url, **kwargs)
+    cacheable = in_memory and os.path.isfile(fpath)
+    if cacheable:
+        try:
+            hash(tuple(kwargs.items()))
+        except TypeError:
+            logg.debug("Unable to keep the dataset in memory, keyword arguments are not hashable")
+            cacheable = False
+
+    if cacheable:
+        # copy, so that the cached object is never modified
+        adata = _read_cached(os.path.abspath(fpath), os.path.getmtime(fpath), **kwargs).copy()
+    else:
+        adata = read(fpath, backup_url=url, **kwargs)
 
     if adata.shape != expected_shape:
         raise ValueError(f"Expected `anndata.AnnData` object to have shape `{expected_shape}`, found `{adata.shape}`.")
@@ -99,7 +123,8 @@ def pancreas(
         - ``'preprocessed-kernel'`` - same as above, but additionally a cell-cell transition matrix has been computed
           using the :class:`~cellrank.kernels.VelocityKernel`.
     kwargs
-        Keyword arguments for :func:`~scanpy.read`.
+        Keyword arguments for :func:`~scanpy.read`. If ``in_memory = True``, keep the most recently read dataset
+        in memory, so that repeated calls with the same arguments return its copy instead of reading the file.
 
     Returns
     -------
@@ -136,7 +161,8 @@ def lung(
     path
         Path where to save the dataset.
     kwargs
-        Keyword arguments for :func:`~scanpy.read`.
+        Keyword arguments for :func:`~scanpy.read`. If ``in_memory = True``, keep the most recently read dataset
+        in memory, so that repeated calls with the same arguments return its copy instead of reading the file.
 
     Returns
     -------
@@ -175,7 +201,8 @@ def reprogramming_morris(
         - ``{s.K85!r}`` - return the subset as described in :cite:`morris:18` Fig. 1, containing `85 010` cells.
         - ``{s.K48!r}`` - return the subset as described in :cite:`morris:18` Fig. 3, containing `48 515` cells.
     kwargs
-        Keyword arguments for :func:`~scanpy.read`.
+        Keyword arguments for :func:`~scanpy.read`. If ``in_memory = True``, keep the most recently read dataset
+        in memory, so that repeated calls with the same arguments return its copy instead of reading the file.
 
     Returns
     -------
@@ -224,7 +251,8 @@ def reprogramming_schiebinger(
         Whether to return the full object or subsetted to the serum condition.
         This subset also contains the pre-computed transition matrix.
     kwargs
-        Keyword arguments for :func:`~scanpy.read`.
+        Keyword arguments for :func:`~scanpy.read`. If ``in_memory = True``, keep the most recently read dataset
+        in memory, so that repeated calls with the same arguments return its copy instead of reading the file.
 
     Returns
     -------
@@ -259,7 +287,8 @@ def zebrafish(
     path
         Path where to save the dataset.
     kwargs
-        Keyword arguments for :func:`~scanpy.read`.
+        Keyword arguments for :func:`~scanpy.read`. If ``in_memory = True``, keep the most recently read dataset
+        in memory, so that repeated calls with the same arguments return its copy instead of reading the file.
 
     Returns
     -------
@@ -283,7 +312,8 @@ def bone_marrow(
     path
         Path where to save the dataset.
     kwargs
-        Keyword arguments for :func:`~scanpy.read`.
+        Keyword arguments for :func:`~scanpy.read`. If ``in_memory = True``, keep the most recently read dataset
+        in memory, so that repeated calls with the same arguments return its copy instead of reading the file.
 
     Returns
     -------
@@ -3,6 +3,7 @@ import types
 from typing import Any, Dict, Literal, Mapping, Optional, Tuple, Union
 
 import numpy as np
+import scipy.linalg
 import scipy.sparse as sp
 
 import matplotlib.pyplot as plt
@@ -68,6 +69,7 @@ class EigenMixin:
         alpha: float = 1.0,
         only_evals: bool = False,
         ncv: Optional[int] = None,
+        sigma: Optional[float] = None,
     ) -> "EigenMixin":
         """Compute eigendecomposition of the :attr:`transition_matrix`.
 
@@ -83,6 +85,12 @@ class EigenMixin:
             Whether to compute only eigenvalues.
         ncv
             Number of Lanczos vectors generated.
+        sigma
+            If not :obj:`None`, use ARPACK's shift-invert mode to find the ``k`` eigenvalues closest to ``sigma``,
+            ignoring ``which``. Values slightly above :math:`1`, such as ``1.0 + 1e-6``, converge in few iterations
+            when only the eigenvalues close to :math:`1` are of interest. ``sigma`` must not be an eigenvalue,
+            e.g., exactly :math:`1`. Requires an LU factorization of the shifted :attr:`transition_matrix`.
+            Ignored when the full eigendecomposition of a small matrix is computed.
 
         Returns
         -------
@@ -96,38 +104,66 @@ class EigenMixin:
 
         start = logg.info("Computing eigendecomposition of the transition matrix")
 
-        if sp.issparse(self.transition_matrix):
-            logg.debug(f"Computing top `{k}` eigenvalues of a sparse matrix")
-            D, V_l = sp.linalg.eigs(self.transition_matrix.T, k=k, which=which, ncv=ncv)
+        tmat = self.transition_matrix
+        n_states = tmat.shape[0]
+        # ARPACK requires `k < n - 1` and its restarts are slower than a single LAPACK call for small matrices
+        use_arpack = k < n_states - 1 and n_states >= max(64, 3 * k)
+
+        if use_arpack:
+            kind = "sparse" if sp.issparse(tmat) else "dense"
+            logg.debug(f"Computing top `{k}` eigenvalues of a {kind} matrix")
+            # transpose once into CSR, products with the CSC view `tmat.T` scatter into the output on every iteration
+            tmat_t = tmat.T.tocsr() if sp.issparse(tmat) else tmat.T
+            if sigma is None:
+                kwargs = {"which": which, "ncv": ncv}
+            else:
+                logg.debug(f"Using shift-invert mode with `sigma={sigma}`")
+                kwargs = {"sigma": sigma, "which": "LM", "ncv": ncv}
+            params = {"which": kwargs["which"], "sigma": sigma, "k": k, "alpha": alpha}
+            D, V_l = sp.linalg.eigs(tmat_t, k=k, **kwargs)
             if only_evals:
                 self._write_eigendecomposition(
                     {
                         "D": get_top_k_evals(),
                         "eigengap": _eigengap(get_top_k_evals().real, alpha),
-                        "params": {"which": which, "k": k, "alpha": alpha},
+                        "params": params,
                     },
                     time=start,
                 )
                 return
-            _, V_r = sp.linalg.eigs(self.transition_matrix, k=k, which=which, ncv=ncv)
+            _, V_r = sp.linalg.eigs(tmat, k=k, **kwargs)
         else:
-            logg.warning("This transition matrix is not sparse, computing full eigendecomposition")
-            D, V_l = np.linalg.eig(self.transition_matrix.T)
+            if k >= n_states - 1:
+                logg.warning(
+                    f"Unable to compute only top `{k}` eigenvalues of a matrix of shape "
+                    f"`{tmat.shape}`, computing full eigendecomposition"
+                )
+            else:
+                logg.debug(f"Computing full eigendecomposition of a small matrix of shape `{tmat.shape}`")
+            if sigma is not None:
+                logg.warning(f"Shift-invert mode is not used for the full eigendecomposition, ignoring `sigma={sigma}`")
+            params = {"which": which, "sigma": None, "k": k, "alpha": alpha}
+            tmat = tmat.toarray() if sp.issparse(tmat) else np.asarray(tmat)
             if only_evals:
+                D = scipy.linalg.eigvals(tmat)
                 self._write_eigendecomposition(
                     {
                         "D": get_top_k_evals(),
-                        "eigengap": _eigengap(D.real, alpha),
-                        "params": {"which": which, "k": k, "alpha": alpha},
+                        "eigengap": _eigengap(get_top_k_evals().real, alpha),
+                        "params": params,
                     },
                     time=start,
                 )
                 return
-            _, V_r = np.linalg.eig(self.transition_matrix)
+            # single LAPACK call for both left and right eigenvectors, `vl` are conjugated w.r.t. `eig(tmat.T)`
+            D, V_l, V_r = scipy.linalg.eig(tmat, left=True, right=True)
+            V_l = V_l.conj()
 
         # Sort the eigenvalues and eigenvectors and take the real part
         logg.debug("Sorting eigenvalues by their real part")
         p = np.flip(np.argsort(D.real))
+        if k < n_states - 1:
+            p = p[:k]
         D, V_l, V_r = D[p], V_l[:, p], V_r[:, p]
         e_gap = _eigengap(D.real, alpha)
 
@@ -141,7 +177,7 @@ class EigenMixin:
                 "V_l": V_l,
                 "V_r": V_r,
                 "eigengap": e_gap,
-                "params": {"which": which, "k": k, "alpha": alpha},
+                "params": params,
             },
             time=start,
         )
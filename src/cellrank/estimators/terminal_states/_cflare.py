@@ -198,13 +198,16 @@ class CFLARE(TermStatesEstimator, LinDriversMixin, EigenMixin):
         )
 
         # fill in the labels in case we filtered out cells before
+        codes, categories = pd.factorize(np.asarray(clusters), sort=True)
         if percentile is not None:
-            labels = np.repeat(None, len(self))
-            labels[ixs] = clusters
+            labels = np.full(len(self), fill_value=-1, dtype=codes.dtype)
+            labels[ixs] = codes
         else:
-            labels = clusters
-        labels = pd.Series(labels, index=self.adata.obs_names, dtype="category")
-        labels = labels.cat.rename_categories({c: str(c) for c in labels.cat.categories})
+            labels = codes
+        labels = pd.Series(
+            pd.Categorical.from_codes(labels, categories=pd.Index(categories).astype(str)),
+            index=self.adata.obs_names,
+        )
 
         # filtering to get rid of some of the leftover transient states
         if n_matches_min > 0:
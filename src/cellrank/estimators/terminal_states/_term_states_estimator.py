@@ -107,7 +107,7 @@ class TermStatesEstimator(BaseEstimator, abc.ABC):
             - categorical :class:`~pandas.Series` where each category corresponds to an individual state.
               `NaN` entries denote cells that do not belong to any state, i.e., transient cells.
             - :class:`dict` where keys are states and values are lists of cell barcodes corresponding to
-              annotations in :attr:`~anndata.AnnData.obs_names`.
+              annotations in :attr:`~anndata.AnnData.obs_names` or boolean masks of shape ``(n_cells,)``.
               If only 1 key is provided, values should correspond to clusters if a categorical
               :class:`~pandas.Series` can be found in :attr:`~anndata.AnnData.obs`.
         cluster_key
@@ -156,7 +156,7 @@ class TermStatesEstimator(BaseEstimator, abc.ABC):
             - categorical :class:`~pandas.Series` where each category corresponds to an individual state.
               `NaN` entries denote cells that do not belong to any state, i.e., transient cells.
             - :class:`dict` where keys are states and values are lists of cell barcodes corresponding to
-              annotations in :attr:`~anndata.AnnData.obs_names`.
+              annotations in :attr:`~anndata.AnnData.obs_names` or boolean masks of shape ``(n_cells,)``.
               If only 1 key is provided, values should correspond to clusters if a categorical
               :class:`~pandas.Series` can be found in :attr:`~anndata.AnnData.obs`.
         cluster_key
@@ -572,9 +572,9 @@ class TermStatesEstimator(BaseEstimator, abc.ABC):
                 clusters = self.adata.obs[key]
                 clusters = clusters.cat.rename_categories({c: str(c) for c in clusters.cat.categories})
                 vals = tuple(str(v) for v in vals)
-                categories = {cat: self.adata[clusters == cat].obs_names for cat in vals}
+                categories = {cat: (clusters == cat).to_numpy() for cat in vals}
 
-            categories = _convert_to_categorical_series(categories, list(self.adata.obs_names))
+            categories = _convert_to_categorical_series(categories, self.adata.obs_names)
         if not is_categorical_dtype(categories):
             raise TypeError(f"Expected object to be `categorical`, found `{infer_dtype(categories)}`.")
 
@@ -553,14 +553,17 @@ class Kernel(KernelExpression, abc.ABC):
         Parameters
         ----------
         deep
-            Whether to use :func:`~copy.deepcopy`.
+            Whether to also copy the :attr:`adata` and the kNN graph, if present.
 
         Returns
         -------
         Copy of self.
         """
+        # the kNN graph is never modified in place, share it between the copies, e.g., when inverting the kernel
+        conn = None if deep else getattr(self, "_conn", None)
+        memo = {} if conn is None else {id(conn): conn}
         with self._remove_adata:
-            k = copy.deepcopy(self)
+            k = copy.deepcopy(self, memo)
         k.adata = self.adata.copy() if deep else self.adata
         return k
 
@@ -48,22 +48,98 @@ def _np_apply_along_axis(func1d, axis: int, arr: np.ndarray) -> np.ndarray:
     return result
 
 
+@nb.njit(**jit_kwargs)
+def _sum_along_axis(arr: np.ndarray, axis: int) -> np.ndarray:
+    """Sum a 2-dimensional array over a given axis.
+
+    The array is always traversed row by row, so that the innermost loop is contiguous for both axes.
+
+    Parameters
+    ----------
+    arr
+        The array to be reduced.
+    axis
+        Axis over which to sum.
+
+    Returns
+    -------
+    The reduced array.
+    """
+    assert arr.ndim == 2
+    assert axis in [0, 1]
+
+    n, m = arr.shape
+    if axis == 0:
+        result = np.zeros(m)
+        for i in range(n):
+            for j in range(m):
+                result[j] += arr[i, j]
+        return result
+
+    result = np.zeros(n)
+    for i in range(n):
+        acc = 0.0
+        for j in range(m):
+            acc += arr[i, j]
+        result[i] = acc
+
+    return result
+
+
+@nb.njit(**jit_kwargs)
+def _sum_sq_dev_along_axis(arr: np.ndarray, axis: int, center: np.ndarray) -> np.ndarray:
+    """Sum the squared deviations of a 2-dimensional array from a center over a given axis.
+
+    Parameters
+    ----------
+    arr
+        The array to be reduced.
+    axis
+        Axis over which to sum.
+    center
+        Center for each entry of the reduced array.
+
+    Returns
+    -------
+    The reduced array.
+    """
+    assert arr.ndim == 2
+    assert axis in [0, 1]
+
+    n, m = arr.shape
+    if axis == 0:
+        result = np.zeros(m)
+        for i in range(n):
+            for j in range(m):
+                result[j] += (arr[i, j] - center[j]) ** 2
+        return result
+
+    result = np.zeros(n)
+    for i in range(n):
+        acc = 0.0
+        for j in range(m):
+            acc += (arr[i, j] - center[i]) ** 2
+        result[i] = acc
+
+    return result
+
+
 @nb.njit(**jit_kwargs)
 def np_mean(array: np.ndarray, axis: int) -> np.ndarray:  # noqa
-    return _np_apply_along_axis(np.mean, axis, array)
+    return _sum_along_axis(array, axis) / array.shape[axis]
 
 
 @nb.njit(**jit_kwargs)
 def np_std(array: np.ndarray, axis: int) -> np.ndarray:  # noqa
-    return _np_apply_along_axis(np.std, axis, array)
+    mean = np_mean(array, axis)
+    return np.sqrt(_sum_sq_dev_along_axis(array, axis, mean) / array.shape[axis])
 
 
 @nb.njit(**jit_kwargs)
 def norm(array: np.ndarray, axis: int) -> np.ndarray:  # noqa
-    return _np_apply_along_axis(np.linalg.norm, axis, array)
+    return np.sqrt(_sum_sq_dev_along_axis(array, axis, np.zeros(array.shape[1 - axis])))
 
 
-# this is faster than using flat array
 @nb.njit(parallel=True)
 def _random_normal(
     m: np.ndarray,
@@ -88,12 +164,52 @@ def _random_normal(
     assert m.ndim == 1, "Means are not 1-dimensional."
     assert m.shape == v.shape, "Means and variances have different shape."
 
-    if n_samples == 1:
-        return np.expand_dims(np.array([np.random.normal(m[i], v[i]) for i in prange(m.shape[0])]), 0)  # noqa: NPY002
+    # fill a preallocated array instead of building it from nested lists, parallelize over the features
+    res = np.empty((m.shape[0], n_samples))
+    for i in prange(m.shape[0]):
+        for j in range(n_samples):
+            res[i, j] = m[i] + v[i] * np.random.standard_normal()  # noqa: NPY002
+
+    return res.T
+
+
+@nb.njit(parallel=True, **jit_kwargs)
+def _rescale_softmax_csr(indptr: np.ndarray, data: np.ndarray, softmax_scale: float) -> np.ndarray:
+    """Rescale the softmax of each row of a row-stochastic matrix.
+
+    Since ``softmax(s * x)`` is proportional to ``softmax(x) ** s``, this is the softmax of the original logits
+    multiplied by ``softmax_scale``. As in the softmax, each row is first divided by its maximum, which avoids
+    underflowing all of its entries for large ``softmax_scale``.
+
+    Parameters
+    ----------
+    indptr
+        Pointer of indices from :class:`~scipy.sparse.csr_matrix`.
+    data
+        Data from :class:`~scipy.sparse.csr_matrix`, each row computed as a softmax.
+    softmax_scale
+        Scaling factor for the softmax function.
 
-    return np.array(
-        [[np.random.normal(m[i], v[i]) for _ in prange(n_samples)] for i in prange(m.shape[0])]  # noqa: NPY002
-    ).T
+    Returns
+    -------
+    The rescaled data.
+    """
+    res = np.empty_like(data)
+    for i in prange(len(indptr) - 1):
+        start, end = indptr[i], indptr[i + 1]
+        row_max = 0.0
+        for j in range(start, end):
+            row_max = max(row_max, data[j])
+        total = 0.0
+        for j in range(start, end):
+            # `(p / p_max) ** s == exp(s * (log(p) - log(p_max)))`, the maximum is always `1`
+            res[j] = (data[j] / row_max) ** softmax_scale if row_max > 0 else 0.0
+            total += res[j]
+        if total > 0:
+            for j in range(start, end):
+                res[j] /= total
+
+    return res
 
 
 @nb.njit(**jit_kwargs)
@@ -111,8 +227,12 @@ def _calculate_starts(indptr: np.ndarray, ixs: np.ndarray) -> np.ndarray:
     -------
     The starting positions.
     """
-    starts = np.cumsum(indptr[ixs + 1] - indptr[ixs])
-    return np.hstack((np.array([0], dtype=starts.dtype), starts))
+    starts = np.empty(len(ixs) + 1, dtype=np.int64)
+    starts[0] = 0
+    for i in range(len(ixs)):
+        starts[i + 1] = starts[i] + indptr[ixs[i] + 1] - indptr[ixs[i]]
+
+    return starts
 
 
 def _get_basis(adata: AnnData, basis: str) -> np.ndarray:
@@ -11,9 +11,15 @@ from cellrank import logging as logg
 from cellrank._utils._docs import d, inject_docs
 from cellrank._utils._enum import DEFAULT_BACKEND, Backend_t
 from cellrank.kernels._base_kernel import BidirectionalKernel
+from cellrank.kernels._utils import _rescale_softmax_csr
 from cellrank.kernels.mixins import ConnectivityMixin
 from cellrank.kernels.utils import Deterministic, MonteCarlo, Stochastic
-from cellrank.kernels.utils._similarity import Similarity, SimilarityABC
+from cellrank.kernels.utils._similarity import (
+    Correlation,
+    Cosine,
+    Similarity,
+    SimilarityABC,
+)
 from cellrank.kernels.utils._velocity_model import BackwardMode, VelocityModel
 
 __all__ = ["VelocityKernel"]
@@ -156,8 +162,11 @@ class VelocityKernel(ConnectivityMixin, BidirectionalKernel):
         if self._reuse_cache(params, time=start):
             return self
 
+        probs_logits = None
         if softmax_scale is None:
-            softmax_scale = self._estimate_softmax_scale(backward_mode=backward_mode, similarity=similarity)
+            softmax_scale, probs_logits = self._estimate_softmax_scale(
+                backward_mode=backward_mode, similarity=similarity
+            )
             logg.info(f"Using `softmax_scale={softmax_scale:.4f}`")
             params["softmax_scale"] = softmax_scale
         # fmt: on
@@ -170,9 +179,24 @@ class VelocityKernel(ConnectivityMixin, BidirectionalKernel):
             n_samples=n_samples,
             seed=seed,
         )
-        if isinstance(model, Stochastic):
-            kwargs["backend"] = DEFAULT_BACKEND
-        self.transition_matrix, self._logits = model(**kwargs)
+        # for these similarities, the scaled softmax can be obtained by rescaling the one from the estimation run
+        if (
+            probs_logits is not None
+            and isinstance(model, Deterministic)
+            and isinstance(model._similarity, (Correlation, Cosine))
+        ):
+            logg.debug("Rescaling the transition probabilities computed when estimating `softmax_scale`")
+            probs, self._logits = probs_logits
+            probs.data = _rescale_softmax_csr(probs.indptr, probs.data, softmax_scale)
+            probs.eliminate_zeros()
+            close_to_1 = np.isclose(probs.sum(1), 1.0)
+            if not np.all(close_to_1):
+                raise ValueError(f"Matrix is not row-stochastic, `{(~close_to_1).sum()}` do not sum to 1.")
+            self.transition_matrix = probs
+        else:
+            if isinstance(model, Stochastic):
+                kwargs["backend"] = DEFAULT_BACKEND
+            self.transition_matrix, self._logits = model(**kwargs)
 
         logg.info("    Finish", time=start)
 
@@ -249,10 +273,10 @@ class VelocityKernel(ConnectivityMixin, BidirectionalKernel):
         n_jobs: Optional[int] = None,
         backend: Backend_t = DEFAULT_BACKEND,
         **kwargs,
-    ) -> float:
+    ) -> Tuple[float, Tuple[sp.csr_matrix, sp.csr_matrix]]:
         model = self._create_model(VelocityModel.DETERMINISTIC, softmax_scale=1.0, **kwargs)
-        _, logits = model(n_jobs, backend)
-        return 1.0 / np.median(np.abs(logits.data))
+        probs, logits = model(n_jobs, backend)
+        return 1.0 / np.median(np.abs(logits.data)), (probs, logits)
 
     def _extract_data(
         self,
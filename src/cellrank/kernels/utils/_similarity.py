@@ -58,7 +58,8 @@ try:
 
         return _softmax_jax(W.dot(X), softmax_scale)
 
-    _predict_transition_probabilities_jax_H = hessian(_predict_transition_probabilities_jax)
+    # `hessian` of a jitted function is not jitted itself and would be re-traced for every cell
+    _predict_transition_probabilities_jax_H = jit(hessian(_predict_transition_probabilities_jax), static_argnums=(3, 4))
 
     _HAS_JAX = True
 except ImportError:
@@ -454,11 +454,13 @@ def aggregate_fate_probabilities(
         probs = probs[mask]
 
     d = collections.OrderedDict()
-    for name in clusters:
-        data = probs.X if is_all else probs.X[(adata.obs[cluster_key] == name).to_numpy()]
-        mean = np.nanmean(data, axis=0)
-        std = np.nanstd(data, axis=0) / np.sqrt(data.shape[0])
-        d[name] = [mean, std]
+    if is_all:
+        data = probs.X
+        d[term_states] = [np.nanmean(data, axis=0), np.nanstd(data, axis=0) / np.sqrt(data.shape[0])]
+    else:
+        codes = pd.Index(clusters).get_indexer(adata.obs[cluster_key])
+        for name, mean, std in zip(clusters, *_aggregate_by_cluster(probs.X, codes, n_clusters=len(clusters))):
+            d[name] = [mean, std]
 
     logg.debug(f"Plotting in mode `{mode!r}`")
     use_clustermap = False
@@ -472,3 +474,42 @@ def aggregate_fate_probabilities(
 
     if save is not None:
         save_fig(fig, save)
+
+
+def _aggregate_by_cluster(data: np.ndarray, codes: np.ndarray, n_clusters: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute the per-cluster mean and standard error, ignoring NaNs.
+
+    Parameters
+    ----------
+    data
+        Array of shape ``(n_cells, n_lineages)``.
+    codes
+        Cluster index for each cell. Cells with a negative index are ignored.
+    n_clusters
+        Number of clusters.
+
+    Returns
+    -------
+    The mean and the standard error, each of shape ``(n_clusters, n_lineages)``.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    mask = codes >= 0
+    data, codes = data[mask], codes[mask]
+    n_cells = data.shape[0]
+
+    # sparse cluster indicator matrix, reductions become a single sparse-dense product
+    indicator = sp.csr_matrix(
+        (np.ones(n_cells, dtype=np.float64), (codes, np.arange(n_cells))),
+        shape=(n_clusters, n_cells),
+    )
+    is_finite = ~np.isnan(data)
+    values = np.where(is_finite, data, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        counts = indicator @ is_finite.astype(np.float64)
+        mean = (indicator @ values) / counts
+        centered = np.where(is_finite, data - mean[codes], 0.0)
+        std = np.sqrt((indicator @ centered**2) / counts)
+        std /= np.sqrt(np.bincount(codes, minlength=n_clusters))[:, None]
+
+    return mean, std
@@ -1,6 +1,6 @@
 import os
 import pathlib
-from typing import Optional, Tuple, Union
+from typing import Any, Optional, Sequence, Tuple, Union
 
 import pytest
 import scvelo as scv
@@ -184,6 +184,30 @@ def assert_array_nan_equal(actual: Union[np.ndarray, pd.Series], expected: Union
     np.testing.assert_array_equal(actual[mask1], expected[mask2])
 
 
+def make_cat(values: Sequence[Any], categories: Sequence[str]) -> pd.Categorical:
+    """
+    Create a categorical directly from its codes.
+
+    Params
+    ------
+    values
+        Values of the categorical. Missing values are denoted by `None` or `NaN`.
+    categories
+        Categories, must contain all non-missing ``values``.
+
+    Returns
+    -------
+    The categorical.
+    """
+    categories = list(categories)
+    codes = np.fromiter(
+        (-1 if pd.isnull(v) else categories.index(v) for v in values),
+        dtype=np.int8,
+        count=len(values),
+    )
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
 def assert_models_equal(
     expected: cr.models.BaseModel,
     actual: cr.models.BaseModel,
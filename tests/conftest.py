@@ -190,6 +190,18 @@ def sklearn_model(adata_cflare: AnnData) -> SKLearnModel:
     return m
 
 
+@pytest.fixture(scope="session")
+def template_model() -> SKLearnModel:
+    # read-only, only used as a template which is copied by the code under test
+    return create_model(_adata_small.copy())
+
+
+@pytest.fixture(scope="session")
+def template_gam() -> GAM:
+    # read-only, only used as a template which is copied by the code under test
+    return GAM(_adata_small.copy())
+
+
 @pytest.fixture()
 def lineage():
     x = cr._utils.Lineage(
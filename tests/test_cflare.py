@@ -38,6 +38,64 @@ class TestCFLARE:
         }
         assert Key.uns.eigen(mc.backward) in mc.adata.uns
 
+    def test_compute_eigendecomposition_small_matrix(self, adata_large: AnnData):
+        vk = VelocityKernel(adata_large).compute_transition_matrix(softmax_scale=4)
+        ck = ConnectivityKernel(adata_large).compute_transition_matrix()
+        terminal_kernel = 0.8 * vk + 0.2 * ck
+
+        mc = cr.estimators.CFLARE(terminal_kernel)
+        mc.compute_eigendecomposition(k=10)
+        arpack = mc.eigendecomposition
+        # `k` is too large w.r.t. the number of states, uses the dense solver
+        mc.compute_eigendecomposition(k=70)
+        dense = mc.eigendecomposition
+
+        assert dense["D"].shape == (70,)
+        assert dense["V_l"].shape == dense["V_r"].shape == (adata_large.n_obs, 70)
+        np.testing.assert_allclose(dense["D"].real[:5], arpack["D"].real[:5], rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(dense["stationary_dist"], arpack["stationary_dist"], rtol=1e-6, atol=1e-8)
+
+    def test_compute_eigendecomposition_shift_invert(self, adata_large: AnnData):
+        vk = VelocityKernel(adata_large).compute_transition_matrix(softmax_scale=4)
+        ck = ConnectivityKernel(adata_large).compute_transition_matrix()
+        terminal_kernel = 0.8 * vk + 0.2 * ck
+
+        mc = cr.estimators.CFLARE(terminal_kernel)
+        mc.compute_eigendecomposition(k=5)
+        expected = mc.eigendecomposition
+        mc.compute_eigendecomposition(k=5, sigma=1.0 + 1e-6)
+        actual = mc.eigendecomposition
+
+        np.testing.assert_allclose(actual["D"].real[:3], expected["D"].real[:3], rtol=1e-6, atol=1e-8)
+        np.testing.assert_allclose(actual["stationary_dist"], expected["stationary_dist"], rtol=1e-6, atol=1e-8)
+        assert expected["params"]["sigma"] is None
+        assert actual["params"]["sigma"] == 1.0 + 1e-6
+        assert actual["params"]["which"] == "LM"
+
+    def test_compute_eigendecomposition_shift_invert_dense(self, mocker):
+        n = 50
+        transition_matrix = 0.99 * np.kron(np.eye(n // 2), np.full((2, 2), 0.5)) + 0.01 / n
+        spy = mocker.spy(cr.logging, "warning")
+
+        mc = cr.estimators.CFLARE(cr.kernels.PrecomputedKernel(transition_matrix))
+        mc.compute_eigendecomposition(k=5, which="LR", sigma=1.0 + 1e-6)
+
+        assert any("sigma" in call.args[0] for call in spy.call_args_list)
+        assert mc.eigendecomposition["params"]["sigma"] is None
+        assert mc.eigendecomposition["params"]["which"] == "LR"
+        assert mc.eigendecomposition["D"].shape == (5,)
+
+    def test_compute_eigendecomposition_dense_only_evals(self):
+        # 25 weakly connected blocks, i.e. 25 eigenvalues close to 1
+        n, k = 50, 5
+        transition_matrix = 0.99 * np.kron(np.eye(n // 2), np.full((2, 2), 0.5)) + 0.01 / n
+
+        mc = cr.estimators.CFLARE(cr.kernels.PrecomputedKernel(transition_matrix))
+        mc.compute_eigendecomposition(k=k, only_evals=True)
+
+        assert mc.eigendecomposition["D"].shape == (k,)
+        assert mc.eigendecomposition["eigengap"] < k
+
     def test_compute_terminal_states_no_eig(self, adata_large: AnnData):
         vk = VelocityKernel(adata_large).compute_transition_matrix(softmax_scale=4)
         ck = ConnectivityKernel(adata_large).compute_transition_matrix()
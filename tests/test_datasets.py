@@ -0,0 +1,66 @@
+import os
+import pathlib
+
+import pytest
+
+import numpy as np
+import scipy.sparse as sp
+
+from anndata import AnnData
+
+from cellrank import datasets
+from cellrank.datasets import _load_dataset_from_url, _read_cached
+
+
+@pytest.fixture()
+def h5ad_path(tmp_path: pathlib.Path) -> pathlib.Path:
+    fpath = tmp_path / "dataset.h5ad"
+    AnnData(sp.csr_matrix(np.arange(1, 51, dtype=np.float64).reshape(10, 5))).write_h5ad(fpath)
+    _read_cached.cache_clear()
+    yield fpath
+    _read_cached.cache_clear()
+
+
+class TestReadCached:
+    def test_not_in_memory_by_default(self, h5ad_path: pathlib.Path, mocker):
+        spy = mocker.spy(datasets, "read")
+
+        _ = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5))
+        _ = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5))
+
+        assert spy.call_count == 2
+        assert _read_cached.cache_info().currsize == 0
+
+    def test_cache_hit(self, h5ad_path: pathlib.Path, mocker):
+        spy = mocker.spy(datasets, "read")
+
+        adata1 = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5), in_memory=True)
+        adata2 = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5), in_memory=True)
+
+        assert spy.call_count == 1
+        assert _read_cached.cache_info().hits == 1
+        assert adata1 is not adata2
+        np.testing.assert_array_equal(adata1.X.toarray(), adata2.X.toarray())
+
+    def test_mtime_invalidates_cache(self, h5ad_path: pathlib.Path, mocker):
+        spy = mocker.spy(datasets, "read")
+
+        _ = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5), in_memory=True)
+        mtime = os.path.getmtime(h5ad_path)
+        os.utime(h5ad_path, (mtime + 10, mtime + 10))
+        _ = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5), in_memory=True)
+
+        assert spy.call_count == 2
+        assert _read_cached.cache_info().hits == 0
+
+    def test_mutation_does_not_leak(self, h5ad_path: pathlib.Path):
+        adata = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5), in_memory=True)
+        expected = adata.X.toarray()
+        adata.X.data[:] = -1
+        adata.obs["foo"] = "bar"
+
+        adata = _load_dataset_from_url(h5ad_path, url="", expected_shape=(10, 5), in_memory=True)
+
+        assert _read_cached.cache_info().hits == 1
+        assert "foo" not in adata.obs
+        np.testing.assert_array_equal(adata.X.toarray(), expected)
@@ -727,6 +727,15 @@ class TestKernelCopy:
         assert ck1.transition_matrix is not None
         assert ck2.transition_matrix is None
 
+    @pytest.mark.parametrize("deep", [False, True])
+    def test_copy_shares_connectivities(self, adata: AnnData, deep: bool):
+        ck1 = ConnectivityKernel(adata).compute_transition_matrix()
+        ck2 = ck1.copy(deep=deep)
+
+        assert (ck1.connectivities is ck2.connectivities) is not deep
+        np.testing.assert_array_equal(ck1.connectivities.A, ck2.connectivities.A)
+        assert ck1.transition_matrix is not ck2.transition_matrix
+
     @pytest.mark.parametrize("ignored", [("_transition_matrix",), ("_params", "foobar")])
     def test_copy_ignore(self, adata: AnnData, ignored: Tuple[str, ...]):
         ck1 = ConnectivityKernel(adata).compute_transition_matrix()
@@ -898,6 +907,39 @@ class TestVelocityScheme:
 
         np.testing.assert_allclose(vk_k.transition_matrix.A, vk_fn.transition_matrix.A)
 
+    @pytest.mark.parametrize("similarity", ["cosine", "correlation"])
+    @pytest.mark.parametrize("backward", [True, False])
+    def test_estimated_softmax_scale_rescaling(self, adata: AnnData, backward: bool, similarity: str):
+        vk_est = VelocityKernel(adata, backward=backward)
+        vk_est.compute_transition_matrix(model="deterministic", similarity=similarity)
+        vk = VelocityKernel(adata, backward=backward)
+        vk.compute_transition_matrix(
+            model="deterministic", similarity=similarity, softmax_scale=vk_est.params["softmax_scale"]
+        )
+
+        np.testing.assert_allclose(vk_est.transition_matrix.A, vk.transition_matrix.A, rtol=1e-6, atol=1e-10)
+        np.testing.assert_allclose(vk_est.logits.A, vk.logits.A)
+
+    @pytest.mark.parametrize("similarity", ["cosine", "correlation"])
+    def test_estimated_softmax_scale_rescaling_large_scale(self, adata: AnnData, similarity: str, mocker):
+        softmax_scale = 1000.0
+        estimate_softmax_scale = VelocityKernel._estimate_softmax_scale
+
+        def estimate_large(self, **kwargs):
+            _, probs_logits = estimate_softmax_scale(self, **kwargs)
+            return softmax_scale, probs_logits
+
+        mocker.patch.object(VelocityKernel, "_estimate_softmax_scale", estimate_large)
+        vk_est = VelocityKernel(adata).compute_transition_matrix(model="deterministic", similarity=similarity)
+        mocker.stopall()
+        vk = VelocityKernel(adata).compute_transition_matrix(
+            model="deterministic", similarity=similarity, softmax_scale=softmax_scale
+        )
+
+        assert vk_est.params["softmax_scale"] == softmax_scale
+        np.testing.assert_allclose(vk_est.transition_matrix.sum(1), 1.0)
+        np.testing.assert_allclose(vk_est.transition_matrix.A, vk.transition_matrix.A, rtol=1e-6, atol=1e-10)
+
     @pytest.mark.parametrize("backward", [True, False])
     def test_custom_function(self, adata: AnnData, backward: bool):
         vk = VelocityKernel(adata, backward=backward)
@@ -100,6 +100,50 @@ class TestScipyLinearSolver:
 
         np.testing.assert_allclose(A @ sol, B, rtol=1e-6, atol=1e-10)
 
+    @pytest.mark.parametrize("solver", ["gmres", "lgmres", "bicgstab", "gcrotmk"])
+    @pytest.mark.parametrize(("seed", "sparse"), zip(range(40, 44), [False] * 2 + [True] * 2))
+    def test_ilu_preconditioner(self, seed: int, sparse: bool, solver: str):
+        A, B = _create_a_b_matrices(seed, sparse)
+
+        sol = _solve_lin_system(
+            A,
+            B,
+            solver=solver,
+            use_petsc=False,
+            use_eye=True,
+            preconditioner="ilu",
+            show_progress_bar=False,
+            tol=1e-8,
+        )
+        assert sol.ndim == 2
+
+        if sparse:
+            A = A.A
+            B = B.A
+        A = np.eye(20, 20) - A
+
+        np.testing.assert_allclose(A @ sol, B, rtol=1e-6, atol=1e-6)
+
+    @pytest.mark.parametrize(("n_jobs", "backend"), [(1, "loky"), (2, "threading")])
+    def test_ilu_preconditioner_factorized_once(self, n_jobs: int, backend: str, mocker):
+        A, B = _create_a_b_matrices(42, True)
+        spy = mocker.spy(sp.linalg, "spilu")
+
+        sol = _solve_lin_system(
+            A,
+            B,
+            solver="gmres",
+            use_eye=True,
+            preconditioner="ilu",
+            n_jobs=n_jobs,
+            backend=backend,
+            show_progress_bar=False,
+            tol=1e-8,
+        )
+
+        assert spy.call_count == 1
+        np.testing.assert_allclose((np.eye(20, 20) - A.A) @ sol, B.A, rtol=1e-6, atol=1e-6)
+
 
 @petsc_slepc_skip
 class TestLinearSolverPETSc:
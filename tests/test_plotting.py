@@ -29,6 +29,7 @@ from cellrank._utils._key import Key
 from cellrank.estimators import CFLARE, GPCCA
 from cellrank.kernels import ConnectivityKernel, PseudotimeKernel, VelocityKernel
 from cellrank.models import GAMR
+from cellrank.pl._aggregate_fate_probs import _aggregate_by_cluster
 
 setup()
 
@@ -495,6 +496,25 @@ class TestAggregateAbsorptionProbabilities:
             save=fpath,
         )
 
+    def test_aggregate_by_cluster(self):
+        rng = np.random.default_rng(42)
+        data = rng.random((50, 3))
+        data[rng.random(data.shape) < 0.2] = np.nan
+        # cluster `2` is empty, cells with `-1` are not part of any cluster
+        codes = rng.choice([-1, 0, 1, 3], size=data.shape[0])
+        codes[:4] = [-1, 0, 1, 3]
+        data[:4] = 0.0  # every cluster has at least 1 finite value per lineage
+
+        mean, std = _aggregate_by_cluster(data, codes, n_clusters=4)
+
+        assert mean.shape == std.shape == (4, 3)
+        np.testing.assert_array_equal(mean[2], np.nan)
+        np.testing.assert_array_equal(std[2], np.nan)
+        for c in [0, 1, 3]:
+            x = data[codes == c]
+            np.testing.assert_allclose(mean[c], np.nanmean(x, axis=0))
+            np.testing.assert_allclose(std[c], np.nanstd(x, axis=0) / np.sqrt(x.shape[0]))
+
 
 class TestClusterTrends:
     @compare()
@@ -1,13 +1,22 @@
-from typing import Any, Optional
+import functools
+import gc
+import re
+from typing import Any, Callable, List, Optional, Tuple
 
 import pytest
-from _helpers import assert_array_nan_equal, create_model, jax_not_installed_skip
+from _helpers import (
+    assert_array_nan_equal,
+    jax_not_installed_skip,
+    make_cat,
+)
+
+import joblib as jl
 
 import numba as nb
 import numpy as np
 import pandas as pd
 import scipy.sparse as sp
-from pandas.api.types import is_categorical_dtype
+from scipy.special import softmax
 
 import scanpy as sc
 from anndata import AnnData
@@ -17,11 +26,16 @@ from cellrank._utils import Lineage
 from cellrank._utils._colors import _compute_mean_color
 from cellrank._utils._parallelize import parallelize
 from cellrank._utils._utils import (
+    _KNN_CACHE,
+    _clear_knn_cache,
     _cluster_X,
     _connected,
+    _convert_to_categorical_series,
     _fuzzy_to_discrete,
     _gene_symbols_ctx,
     _irreducible,
+    _knn_connectivities,
+    _make_index_unique,
     _merge_categorical_series,
     _one_hot,
     _partition,
@@ -33,11 +47,11 @@ from cellrank.kernels._utils import (
     _calculate_starts,
     _np_apply_along_axis,
     _random_normal,
+    norm,
+    np_mean,
+    np_std,
 )
-from cellrank.kernels.utils._similarity import (
-    _predict_transition_probabilities_jax,
-    _predict_transition_probabilities_numpy,
-)
+from cellrank.kernels.utils._similarity import _predict_transition_probabilities_numpy
 from cellrank.models import GAM, BaseModel
 from cellrank.pl._utils import (
     _create_callbacks,
@@ -46,107 +60,193 @@ from cellrank.pl._utils import (
 )
 
 
+@pytest.fixture(scope="module")
+def xy_cat() -> Tuple[pd.Series, pd.Series]:
+    # read-only, tests which need to modify the series must copy them
+    x = pd.Series(make_cat(["a", "b", None, "b", None], ["a", "b"]))
+    y = pd.Series(make_cat(["b", None, "a", "d", "a"], ["a", "b", "d"]))
+    return x, y
+
+
+@pytest.fixture(scope="module")
+def one_hot_mat() -> np.ndarray:
+    return np.array(
+        [[0, 0, 1], [0, 0, 1], [0, 0, 0], [1, 0, 0], [1, 0, 0], [0, 1, 0]],
+        dtype="bool",
+    )
+
+
+@pytest.fixture(scope="module")
+def one_hot_expected() -> pd.Series:
+    # expected result of `_series_from_one_hot_matrix(one_hot_mat)`
+    codes = np.array([2, 2, -1, 0, 0, 1], dtype=np.int8)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=["0", "1", "2"]))
+
+
+@pytest.fixture(scope="module")
+def a_fuzzy_100x3() -> np.ndarray:
+    # random data that sums to one row-wise
+    rng = np.random.default_rng(42)
+    a_fuzzy = softmax(rng.normal(size=(100, 3)), axis=1)
+    a_fuzzy.setflags(write=False)
+    return a_fuzzy
+
+
+# inputs for `TestKernelUtils.test_numpy_and_jax`, drawn once
+_RNG_BLOCK = np.random.default_rng(0).standard_normal((4, 2, 100))
+_RNG_BLOCK.setflags(write=False)
+
+_NUMBA_REDUCERS = {
+    "mean": (np_mean, np.mean),
+    "std": (np_std, np.std),
+    "norm": (norm, np.linalg.norm),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _create_numba_fn(fn: Callable[[np.ndarray], float]) -> Callable[[int, np.ndarray], np.ndarray]:
+    # compile only once per reduction, `axis` is a runtime argument
+    @nb.njit
+    def wrapped(axis: int, x: np.ndarray):
+        return _np_apply_along_axis(fn, axis, x)
+
+    return wrapped
+
+
+def _callback_returns_42(*_args, **_kwargs):
+    return 42
+
+
+def _callback_not_prepared(model: BaseModel, **_kwargs) -> BaseModel:
+    return model
+
+
+def _callback_modifies_gene(model: BaseModel, **kwargs) -> BaseModel:
+    model = model.prepare(**kwargs)
+    model._gene = "bar"
+    return model
+
+
+def _callback_modifies_lineage(model: BaseModel, **kwargs) -> BaseModel:
+    model = model.prepare(**kwargs)
+    model._lineage = "bar"
+    return model
+
+
+def _callback_raises(_model: BaseModel, **_kwargs) -> BaseModel:
+    raise TypeError("foobar")
+
+
 class TestToolsUtils:
-    def test_merge_not_categorical(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_merge_not_categorical(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
         y = pd.Series(["b", np.nan, np.nan, "d", "a"])
         with pytest.raises(TypeError, match=r".*categorical"):
             _ = _merge_categorical_series(x, y)
 
-    def test_merge_different_index(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_merge_different_index(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
         y = pd.Series(["b", np.nan, np.nan, "d", "a"], index=[5, 4, 3, 2, 1]).astype("category")
         with pytest.raises(ValueError, match=r"Index .* differ"):
             _ = _merge_categorical_series(x, y)
 
-    def test_merge_normal_run(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        expected = pd.Series(["b", "b", "a", "d", "a"]).astype("category")
+    def test_merge_normal_run(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, y = xy_cat
+        expected = pd.Series(make_cat(["b", "b", "a", "d", "a"], ["a", "b", "d"]))
 
         res = _merge_categorical_series(x, y)
 
-        np.testing.assert_array_equal(res.values, expected.values)
+        assert res.equals(expected)
 
     def test_merge_normal_run_completely_different_categories(self):
-        x = pd.Series(["a", "a", "a"]).astype("category")
-        y = pd.Series(["b", "b", "b"]).astype("category")
-        expected = pd.Series(["b", "b", "b"]).astype("category")
+        x = pd.Series(make_cat(["a", "a", "a"], ["a"]))
+        y = pd.Series(make_cat(["b", "b", "b"], ["b"]))
+        expected = pd.Series(make_cat(["b", "b", "b"], ["b"]))
 
         res = _merge_categorical_series(x, y)
 
-        np.testing.assert_array_equal(res.values, expected.values)
+        assert res.equals(expected)
         np.testing.assert_array_equal(res.cat.categories.values, ["b"])
 
-    def test_merge_colors_not_colorlike(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        colors_x = ["red", "foo"]
-
-        with pytest.raises(ValueError, match=r".* are color-like"):
-            _ = _merge_categorical_series(x, y, colors_old=colors_x)
-
-    def test_merge_colors_wrong_number_of_colors(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        colors_x = ["red"]
-
-        with pytest.raises(ValueError, match=r".* differ in length"):
-            _ = _merge_categorical_series(x, y, colors_old=colors_x)
+    def test_convert_to_categorical_series_normal_run(self):
+        cell_names = [f"cell_{i}" for i in range(10)]
+        res = _convert_to_categorical_series({"b": ["cell_1", "cell_2"], 0: [3, 4]}, cell_names)
 
-    def test_merge_colors_wrong_dict(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        colors_x = {"a": "red", "foo": "blue"}
+        assert isinstance(res.dtype, pd.CategoricalDtype)
+        np.testing.assert_array_equal(res.index, cell_names)
+        np.testing.assert_array_equal(res.cat.categories, ["0", "b"])
+        np.testing.assert_array_equal(np.where(res == "b")[0], [1, 2])
+        np.testing.assert_array_equal(np.where(res == "0")[0], [3, 4])
+        assert res.isna().sum() == 6
 
-        with pytest.raises(ValueError, match=r"Color mapper"):
-            _ = _merge_categorical_series(x, y, colors_old=colors_x)
+    def test_convert_to_categorical_series_overwrite(self):
+        cell_names = [f"cell_{i}" for i in range(5)]
+        res = _convert_to_categorical_series({"a": ["cell_0"], "b": ["cell_0", "cell_1"]}, cell_names)
 
-    def test_merge_colors_simple_old(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        expected = pd.Series(["b", "b", "a", "d", "a"]).astype("category")
-        colors_x = ["red", "blue"]
+        np.testing.assert_array_equal(res.cat.categories, ["b"])
+        np.testing.assert_array_equal(np.where(res == "b")[0], [0, 1])
 
-        merged, colors_merged = _merge_categorical_series(x, y, colors_old=colors_x)
+    def test_convert_to_categorical_series_boolean_mask(self):
+        cell_names = [f"cell_{i}" for i in range(5)]
+        mask = np.array([False, True, True, False, False])
+        res = _convert_to_categorical_series({"a": mask, "b": ["cell_4"]}, cell_names)
 
-        np.testing.assert_array_equal(merged.values, expected.values)
-        np.testing.assert_array_equal(colors_merged, ["red", "blue", "#279e68"])
+        np.testing.assert_array_equal(res.cat.categories, ["a", "b"])
+        np.testing.assert_array_equal(np.where(res == "a")[0], [1, 2])
+        np.testing.assert_array_equal(np.where(res == "b")[0], [4])
 
-    def test_merge_colors_simple_new(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        colors_y = ["red", "blue", "green"]
+    def test_convert_to_categorical_series_invalid_mask(self):
+        with pytest.raises(ValueError, match=r"Expected boolean mask of length"):
+            _ = _convert_to_categorical_series({"a": np.array([True, False])}, ["cell_0", "cell_1", "cell_2"])
 
-        _, colors_merged = _merge_categorical_series(x, y, colors_new=colors_y)
+    def test_convert_to_categorical_series_invalid_names(self):
+        with pytest.raises(ValueError, match=r"Invalid cell names"):
+            _ = _convert_to_categorical_series({"a": ["foo"]}, ["cell_0", "cell_1"])
 
-        np.testing.assert_array_equal(colors_merged, ["#1f77b4", "#ff7f0e", "green"])
-
-    def test_merge_colors_both(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        colors_x = ["red", "blue"]
-        colors_y = ["green", "yellow", "black"]
-
-        _, colors_merged = _merge_categorical_series(x, y, colors_old=colors_x, colors_new=colors_y)
+    @pytest.mark.parametrize(
+        ("colors_old", "match"),
+        [
+            (["red", "foo"], r".* are color-like"),
+            (["red"], r".* differ in length"),
+            ({"a": "red", "foo": "blue"}, r"Color mapper"),
+        ],
+    )
+    def test_merge_colors_invalid(self, xy_cat: Tuple[pd.Series, pd.Series], colors_old: Any, match: str):
+        x, y = xy_cat
 
-        np.testing.assert_array_equal(colors_merged, ["red", "blue", "black"])
+        with pytest.raises(ValueError, match=match):
+            _ = _merge_categorical_series(x, y, colors_old=colors_old)
 
-    def test_merge_colors_both_overwrite(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        y = pd.Series(["b", np.nan, "a", "d", "a"]).astype("category")
-        colors_x = ["red", "blue"]
-        colors_y = ["green", "yellow", "black"]
+    @pytest.mark.parametrize(
+        ("colors_old", "colors_new", "overwrite", "expected_colors"),
+        [
+            (["red", "blue"], None, False, ["red", "blue", "#279e68"]),
+            (None, ["red", "blue", "green"], False, ["#1f77b4", "#ff7f0e", "green"]),
+            (["red", "blue"], ["green", "yellow", "black"], False, ["red", "blue", "black"]),
+            (["red", "blue"], ["green", "yellow", "black"], True, ["green", "yellow", "black"]),
+        ],
+    )
+    def test_merge_colors(
+        self,
+        xy_cat: Tuple[pd.Series, pd.Series],
+        colors_old: Optional[Any],
+        colors_new: Optional[Any],
+        overwrite: bool,
+        expected_colors: Any,
+    ):
+        x, y = xy_cat
+        expected = pd.Series(make_cat(["b", "b", "a", "d", "a"], ["a", "b", "d"]))
 
-        _, colors_merged = _merge_categorical_series(
+        merged, colors_merged = _merge_categorical_series(
             x,
             y,
-            colors_old=colors_x,
-            colors_new=colors_y,
-            color_overwrite=True,
+            colors_old=colors_old,
+            colors_new=colors_new,
+            color_overwrite=overwrite,
         )
 
-        np.testing.assert_array_equal(colors_merged, ["green", "yellow", "black"])
+        assert merged.equals(expected)
+        np.testing.assert_array_equal(colors_merged, expected_colors)
 
     def test_matrix_irreducibility(self, test_matrix_1: np.ndarray, test_matrix_2: np.ndarray):
         assert _irreducible(test_matrix_1)
@@ -166,15 +266,18 @@ class TestToolsUtils:
         test_matrix_2: np.ndarray,
         test_matrix_3: np.ndarray,
     ):
-        np.testing.assert_array_equal(_partition(test_matrix_1)[0][0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
-        np.testing.assert_array_equal(_partition(test_matrix_1)[1], [])
+        p1 = _partition(test_matrix_1)
+        np.testing.assert_array_equal(p1[0][0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        np.testing.assert_array_equal(p1[1], [])
 
-        np.testing.assert_array_equal(_partition(test_matrix_2)[0][0], [12, 13])
-        np.testing.assert_array_equal(_partition(test_matrix_2)[1][0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        p2 = _partition(test_matrix_2)
+        np.testing.assert_array_equal(p2[0][0], [12, 13])
+        np.testing.assert_array_equal(p2[1][0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
 
-        np.testing.assert_array_equal(_partition(test_matrix_3)[0][0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
-        np.testing.assert_array_equal(_partition(test_matrix_3)[0][1], [12, 13])
-        np.testing.assert_array_equal(_partition(test_matrix_3)[1], [])
+        p3 = _partition(test_matrix_3)
+        np.testing.assert_array_equal(p3[0][0], [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        np.testing.assert_array_equal(p3[0][1], [12, 13])
+        np.testing.assert_array_equal(p3[1], [])
 
 
 class TestProcessSeries:
@@ -184,63 +287,72 @@ class TestProcessSeries:
         with pytest.raises(TypeError, match=r".*categorical"):
             _ = _process_series(x, ["foo"])
 
-    def test_colors_wrong_number_of_colors(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_colors_wrong_number_of_colors(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
 
         with pytest.raises(ValueError, match=r".* does not match"):
             _ = _process_series(x, ["foo"], cols=["red"])
 
-    def test_colors_not_colorlike(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_colors_not_colorlike(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
 
         with pytest.raises(ValueError, match=r".* are color-like"):
             _ = _process_series(x, ["a", "b"], cols=["bar", "baz"])
 
-    def test_keys_are_not_proper_categories(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_keys_are_not_proper_categories(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
 
         with pytest.raises(ValueError, match=r"are proper categories"):
             _ = _process_series(x, ["foo"])
 
-    def test_keys_overlap(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_keys_overlap(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
 
         with pytest.raises(ValueError, match=r"Found overlapping keys"):
             _ = _process_series(x, ["a", "b, a"])
 
-    def test_normal_run(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        expected = pd.Series(["a"] + [np.nan] * 4).astype("category")
-
-        res = _process_series(x, keys=["a"])
-
-        assert_array_nan_equal(expected, res)
-
-    def test_repeat_key(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-        expected = pd.Series(["a"] + [np.nan] * 4).astype("category")
-
-        res = _process_series(x, keys=["a, a, a"])
-
-        assert_array_nan_equal(res, expected)
-
-    def test_reoder_keys(self):
-        x = pd.Series(["b", "c", "a", "d", "a"]).astype("category")
-        expected = pd.Series(["a, b, d", np.nan] + ["a, b, d"] * 3).astype("category")
+    @pytest.mark.parametrize(
+        ("x", "keys", "expected"),
+        [
+            (
+                make_cat(["a", "b", None, "b", None], ["a", "b"]),
+                ["a"],
+                make_cat(["a", None, None, None, None], ["a"]),
+            ),
+            (
+                make_cat(["a", "b", None, "b", None], ["a", "b"]),
+                ["a, a, a"],
+                make_cat(["a", None, None, None, None], ["a"]),
+            ),
+            (
+                make_cat(["b", "c", "a", "d", "a"], ["a", "b", "c", "d"]),
+                ["b, a, d"],
+                make_cat(["a, b, d", None, "a, b, d", "a, b, d", "a, b, d"], ["a, b, d"]),
+            ),
+            (
+                make_cat(["a", "b", None, "b", None], ["a", "b"]),
+                [],
+                make_cat([None] * 5, []),
+            ),
+        ],
+    )
+    def test_process_keys(self, x: pd.Categorical, keys: List[str], expected: pd.Categorical):
+        x, expected = pd.Series(x), pd.Series(expected)
 
-        res = _process_series(x, keys=["b, a, d"])
+        res = _process_series(x, keys=keys)
 
+        assert res.shape == x.shape
         assert_array_nan_equal(res, expected)
 
-    def test_no_keys(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_no_keys(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
 
         res = _process_series(x, keys=None)
 
         assert x is res
 
-    def test_no_keys_colors(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
+    def test_no_keys_colors(self, xy_cat: Tuple[pd.Series, pd.Series]):
+        x, _ = xy_cat
         colors = ["foo"]
 
         res, res_colors = _process_series(x, keys=None, cols=colors)
@@ -248,22 +360,14 @@ class TestProcessSeries:
         assert x is res
         assert colors is res_colors
 
-    def test_empty_keys(self):
-        x = pd.Series(["a", "b", np.nan, "b", np.nan]).astype("category")
-
-        res = _process_series(x, [])
-
-        assert res.shape == x.shape
-        assert np.all(pd.isnull(res))
-
     def test_return_colors(self):
-        x = pd.Series(["b", "c", "a", "d", "a"]).astype("category")
-        expected = pd.Series(["a, b", "c, d", "a, b", "c, d", "a, b"]).astype("category")
+        x = pd.Series(make_cat(["b", "c", "a", "d", "a"], ["a", "b", "c", "d"]))
+        expected = pd.Series(make_cat(["a, b", "c, d", "a, b", "c, d", "a, b"], ["a, b", "c, d"]))
 
         res, colors = _process_series(x, keys=["b, a", "d, c"], cols=["red", "green", "blue", "white"])
 
         assert isinstance(res, pd.Series)
-        assert is_categorical_dtype(res)
+        assert isinstance(res.dtype, pd.CategoricalDtype)
         assert isinstance(colors, list)
 
         np.testing.assert_array_equal(res.values, expected.values)
@@ -274,33 +378,22 @@ class TestProcessSeries:
 
 
 class TestOneHot:
-    def test_normal_run(self):
-        _one_hot(n=10, cat=5)
-        _one_hot(n=10, cat=None)
-
-    def test_return_vector(self):
-        a = _one_hot(n=10, cat=None)
-        b = _one_hot(n=10, cat=5)
+    @pytest.mark.parametrize("cat", [None, 0, 5, 9])
+    def test_one_hot_correct(self, cat: Optional[int]):
+        expected = np.zeros(10, dtype=bool) if cat is None else np.eye(10, dtype=bool)[cat]
+        res = _one_hot(n=10, cat=cat)
 
-        b_check = np.zeros(10)
-        b_check[5] = True
+        assert res.dtype == bool
+        np.testing.assert_array_equal(res, expected)
 
-        assert a.dtype == "bool"
-        assert b.dtype == "bool"
-        assert (a == np.zeros(10)).all()
-        assert (b == b_check).all()
-
-    def test_index_error(self):
+    def test_one_hot_raises(self):
         with pytest.raises(IndexError, match=r"out of bounds"):
             _ = _one_hot(10, 10)
 
 
 class TestFuzzyToDiscrete:
-    def test_normal_run(self):
-        # create random data that sums to one row-wise
-        rng = np.random.default_rng(42)
-        a_fuzzy = rng.normal(size=(100, 3))
-        a_fuzzy = np.exp(a_fuzzy) / np.sum(np.exp(a_fuzzy), 1)[:, None]
+    def test_normal_run(self, a_fuzzy_100x3: np.ndarray):
+        a_fuzzy = a_fuzzy_100x3
 
         # check with both overlap handling
         _fuzzy_to_discrete(a_fuzzy=a_fuzzy)
@@ -308,29 +401,24 @@ class TestFuzzyToDiscrete:
         _fuzzy_to_discrete(a_fuzzy=a_fuzzy, n_most_likely=30, remove_overlap=False)
 
     def test_one_state(self):
-        # create random data that sums to one row-wise
-        rng = np.random.default_rng(42)
-        a_fuzzy = rng.normal(size=(100, 1))
-        a_fuzzy = np.exp(a_fuzzy) / np.sum(np.exp(a_fuzzy), 1)[:, None]
+        # with only one state, every row-wise normalized matrix is all ones
+        a_fuzzy = np.ones((100, 1))
 
         # check with both overlap handling
         _fuzzy_to_discrete(a_fuzzy=a_fuzzy)
 
-    def test_normalization(self):
-        rng = np.random.default_rng(42)
-        a_fuzzy = rng.normal(size=(100, 3))
+    def test_normalization(self, a_fuzzy_100x3: np.ndarray):
+        a_fuzzy = 2 * a_fuzzy_100x3
         with pytest.raises(ValueError, match=r".* do not sum to"):
             _fuzzy_to_discrete(a_fuzzy=a_fuzzy)
 
-    def test_too_many_cells(self):
-        rng = np.random.default_rng(42)
-        a_fuzzy = rng.normal(size=(100, 3))
-        a_fuzzy = np.exp(a_fuzzy) / np.sum(np.exp(a_fuzzy), 1)[:, None]
+    def test_too_many_cells(self, a_fuzzy_100x3: np.ndarray):
+        a_fuzzy = a_fuzzy_100x3
         with pytest.raises(ValueError, match=r".* decrease this to at most"):
             _fuzzy_to_discrete(a_fuzzy=a_fuzzy, n_most_likely=50)
 
     def test_raise_threshold(self):
-        a_fuzzy = np.repeat(np.array([0.9, 0.1])[None, :], 10, 0)
+        a_fuzzy = np.broadcast_to(np.array([0.9, 0.1]), (10, 2))
         with pytest.raises(ValueError, match=r"Discretizing leads"):
             _fuzzy_to_discrete(a_fuzzy, n_most_likely=3, remove_overlap=True)
         with pytest.raises(ValueError, match=r"Discretizing leads"):
@@ -367,8 +455,8 @@ class TestFuzzyToDiscrete:
             ]
         )
 
-        np.testing.assert_array_equal(a_actual_1, a_expected)
-        np.testing.assert_array_equal(a_actual_2, a_expected)
+        assert np.array_equal(a_actual_1, a_expected)
+        assert np.array_equal(a_actual_2, a_expected)
         assert len(c_1) == 0
         assert len(c_2) == 0
 
@@ -417,24 +505,14 @@ class TestFuzzyToDiscrete:
 
 
 class TestSeriesFromOneHotMatrix:
-    def test_normal_run(self):
-        a = np.array(
-            [[0, 0, 1], [0, 0, 1], [0, 0, 0], [1, 0, 0], [1, 0, 0], [0, 1, 0]],
-            dtype="bool",
-        )
-        res = _series_from_one_hot_matrix(a)
+    def test_normal_run(self, one_hot_mat: np.ndarray, one_hot_expected: pd.Series):
+        res = _series_from_one_hot_matrix(one_hot_mat)
 
-        assert_array_nan_equal(
-            np.array(res).astype(np.float32),
-            np.array([2, 2, np.nan, 0, 0, 1], dtype=np.float32),
-        )
+        assert res.equals(one_hot_expected)
         np.testing.assert_array_equal(res.cat.categories, ["0", "1", "2"])
 
-    def test_name_mismatch(self):
-        a = np.array(
-            [[0, 0, 1], [0, 0, 1], [0, 0, 0], [1, 0, 0], [1, 0, 0], [0, 1, 0]],
-            dtype="bool",
-        )
+    def test_name_mismatch(self, one_hot_mat: np.ndarray):
+        a = one_hot_mat
         names = ["0", "1"]
 
         with pytest.raises(ValueError, match="Shape mismatch"):
@@ -458,70 +536,58 @@ class TestSeriesFromOneHotMatrix:
         with pytest.raises(ValueError, match=r".* are one-hot encoded"):
             _series_from_one_hot_matrix(a)
 
-    def test_normal_return(self):
-        a = np.array(
-            [[0, 0, 1], [0, 0, 1], [0, 0, 0], [1, 0, 0], [1, 0, 0], [0, 1, 0]],
-            dtype="bool",
-        )
-        actual_series = _series_from_one_hot_matrix(a)
-
-        expected_series = pd.Series(index=range(6), dtype="category")
-        expected_series = expected_series.cat.add_categories(["0", "1", "2"])
-        expected_series[0] = "2"
-        expected_series[1] = "2"
-        expected_series[3] = "0"
-        expected_series[4] = "0"
-        expected_series[5] = "1"
+    def test_normal_return(self, one_hot_mat: np.ndarray, one_hot_expected: pd.Series):
+        actual_series = _series_from_one_hot_matrix(one_hot_mat)
 
-        assert actual_series.equals(expected_series)
-        np.testing.assert_array_equal(actual_series.cat.categories, expected_series.cat.categories)
+        assert actual_series.equals(one_hot_expected)
+        np.testing.assert_array_equal(actual_series.cat.categories, one_hot_expected.cat.categories)
 
 
 class TestCreateModels:
-    def test_create_models_not_a_model_local(self):
-        with pytest.raises(TypeError, match=r"Expected the model for gene"):
-            _create_models({"foo": {"bar": 42}}, ["foo"], ["bar"])
+    @pytest.mark.parametrize(
+        ("models", "genes", "lineages", "exc", "match"),
+        [
+            ({"foo": {"bar": 42}}, ["foo"], ["bar"], TypeError, r"Expected the model for gene"),
+            ({}, ["foo"], [], ValueError, r"No lineages have been selected"),
+            ({"foo": {}}, ["foo"], ["bar"], ValueError, r"No options were specified for all lineages"),
+        ],
+    )
+    def test_create_models_raises(self, models: Any, genes: List[str], lineages: List[str], exc: type, match: str):
+        with pytest.raises(exc, match=match):
+            _create_models(models, genes, lineages)
 
-    def test_create_models_not_a_model_gene_fallback(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_models_not_a_model_gene_fallback(self, template_model: BaseModel):
+        m = template_model
         with pytest.raises(TypeError, match=r"Expected the gene fallback model"):
             _create_models({"foo": {"baz": m}, "*": 42}, ["foo", "bar"], ["baz"])
 
-    def test_create_models_not_a_model_lineage_fallback(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_models_not_a_model_lineage_fallback(self, template_model: BaseModel):
+        m = template_model
         with pytest.raises(TypeError, match=r"Expected the lineage fallback model"):
             _create_models({"foo": {"baz": m, "*": 42}}, ["foo"], ["bar", "baz"])
 
-    def test_create_models_no_models_gene(self):
-        with pytest.raises(ValueError, match=r"No lineages have been selected"):
-            _create_models({}, ["foo"], [])
-
-    def test_create_models_no_models_lineage(self):
-        with pytest.raises(ValueError, match=r"No options were specified for all lineages"):
-            _create_models({"foo": {}}, ["foo"], ["bar"])
-
-    def test_create_models_gene_incomplete(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_models_gene_incomplete(self, template_model: BaseModel):
+        m = template_model
         with pytest.raises(ValueError, match=r"No options were specified for genes"):
             _create_models({"foo": {"baz": m}}, ["foo", "bar"], ["baz"])
 
-    def test_create_models_lineage_incomplete(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_models_lineage_incomplete(self, template_model: BaseModel):
+        m = template_model
         with pytest.raises(ValueError, match=r"No options were specified for all lineages"):
             _create_models({"foo": {"baz": m}}, ["foo"], ["bar", "baz"])
 
-    def test_create_model_no_genes(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_model_no_genes(self, template_model: BaseModel):
+        m = template_model
         with pytest.raises(ValueError, match=r"No genes have been selected"):
             _create_models(m, [], ["foo"])
 
-    def test_create_model_no_lineage(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_model_no_lineage(self, template_model: BaseModel):
+        m = template_model
         with pytest.raises(ValueError, match=r"No lineages have been selected"):
             _create_models(m, ["foo"], [])
 
-    def test_create_models_1_model(self, adata: AnnData):
-        m = create_model(adata)
+    def test_create_models_1_model(self, template_model: BaseModel):
+        m = template_model
         models = _create_models(m, ["foo"], ["bar"])
 
         assert set(models.keys()) == {"foo"}
@@ -529,9 +595,9 @@ class TestCreateModels:
         assert isinstance(models["foo"]["bar"], type(m))
         assert models["foo"]["bar"] is not m
 
-    def test_create_models_gene_specific(self, adata: AnnData):
-        m1 = create_model(adata)
-        m2 = GAM(adata)
+    def test_create_models_gene_specific(self, template_model: BaseModel, template_gam: GAM):
+        m1 = template_model
+        m2 = template_gam
 
         models = _create_models({"foo": m1, "bar": m2}, ["foo", "bar"], ["baz"])
         assert set(models.keys()) == {"foo", "bar"}
@@ -543,9 +609,9 @@ class TestCreateModels:
         assert isinstance(models["bar"]["baz"], type(m2))
         assert models["bar"]["baz"] is not m2
 
-    def test_create_models_gene_specific_fallback(self, adata: AnnData):
-        m1 = create_model(adata)
-        m2 = GAM(adata)
+    def test_create_models_gene_specific_fallback(self, template_model: BaseModel, template_gam: GAM):
+        m1 = template_model
+        m2 = template_gam
 
         models = _create_models({"foo": m1, "*": m2}, ["foo", "bar", "baz", "quux"], ["quas", "wex"])
         assert set(models.keys()) == {"foo", "bar", "baz", "quux"}
@@ -562,9 +628,9 @@ class TestCreateModels:
                 assert isinstance(models[g][l], type(m2))
                 assert models[g][l] is not m2
 
-    def test_create_models_lineage_specific(self, adata: AnnData):
-        m1 = create_model(adata)
-        m2 = GAM(adata)
+    def test_create_models_lineage_specific(self, template_model: BaseModel, template_gam: GAM):
+        m1 = template_model
+        m2 = template_gam
 
         models = _create_models({"foo": {"bar": m1, "baz": m2}}, ["foo"], ["bar", "baz"])
         assert set(models["foo"].keys()) == {"bar", "baz"}
@@ -574,9 +640,9 @@ class TestCreateModels:
         assert isinstance(models["foo"]["baz"], type(m2))
         assert models["foo"]["baz"] is not m2
 
-    def test_create_models_lineage_specific_fallback(self, adata: AnnData):
-        m1 = create_model(adata)
-        m2 = GAM(adata)
+    def test_create_models_lineage_specific_fallback(self, template_model: BaseModel, template_gam: GAM):
+        m1 = template_model
+        m2 = template_gam
 
         models = _create_models(
             {"foo": {"baz": m1, "*": m2}, "bar": {"quux": m2, "*": m1}},
@@ -604,35 +670,40 @@ class TestCreateModels:
 
 
 class TestCreateCallbacks:
-    def test_no_genes(self, adata_cflare: AnnData):
-        with pytest.raises(ValueError, match=r"No genes have been selected"):
-            _create_callbacks(adata_cflare, None, [], ["foo"])
-
-    def test_no_lineages(self, adata_cflare: AnnData):
-        with pytest.raises(ValueError, match=r"No lineages have been selected"):
-            _create_callbacks(adata_cflare, None, ["foo"], [])
-
-    def test_callback_gene_fallback_not_callable(self, adata_cflare: AnnData):
-        with pytest.raises(TypeError, match=r"Expected the gene fallback callback"):
-            _create_callbacks(
-                adata_cflare,
+    @pytest.mark.parametrize(
+        ("callbacks", "genes", "lineages", "exc", "match"),
+        [
+            (None, [], ["foo"], ValueError, r"No genes have been selected"),
+            (None, ["foo"], [], ValueError, r"No lineages have been selected"),
+            ({}, ["foo"], [], ValueError, r"No lineages have been selected"),
+            (
                 {"foo": _default_model_callback, "*": 42},
                 ["foo", "bar"],
                 ["baz"],
-            )
-
-    def test_callback_lineage_fallback_not_callable(self, adata_cflare: AnnData):
-        with pytest.raises(TypeError, match=r"Expected the lineage fallback callback"):
-            _create_callbacks(
-                adata_cflare,
+                TypeError,
+                r"Expected the gene fallback callback",
+            ),
+            (
                 {"foo": {"bar": _default_model_callback, "*": 42}},
                 ["foo"],
                 ["bar", "baz"],
-            )
-
-    def test_create_callbacks_no_models_lineage(self, adata_cflare: AnnData):
-        with pytest.raises(ValueError, match=r"No lineages have been selected"):
-            _create_callbacks(adata_cflare, {}, ["foo"], [])
+                TypeError,
+                r"Expected the lineage fallback callback",
+            ),
+            (_callback_returns_42, ["foo"], ["bar"], RuntimeError, r"Callback validation"),
+        ],
+    )
+    def test_create_callbacks_raises(
+        self,
+        adata_cflare: AnnData,
+        callbacks: Any,
+        genes: List[str],
+        lineages: List[str],
+        exc: type,
+        match: str,
+    ):
+        with pytest.raises(exc, match=match):
+            _create_callbacks(adata_cflare, callbacks, genes, lineages)
 
     def test_create_models_no_models_lineage(self, adata_cflare: AnnData):
         # in contrast to _create_models, incomplete specification leads to default callback
@@ -721,88 +792,41 @@ class TestCreateCallbacks:
         assert cbs["foo"]["bar"] is _default_model_callback
         assert cbs["foo"]["baz"] is _default_model_callback
 
-    def test_callback_does_not_return_model(self, adata_cflare: AnnData):
-        def cb(*_args, **_kwargs):
-            return 42
-
-        with pytest.raises(RuntimeError, match="Callback validation"):
-            _create_callbacks(
-                adata_cflare,
-                cb,
-                ["foo"],
-                ["bar"],
-            )
-
-    def test_callback_wrong_gene(self, adata_cflare: AnnData):
-        with pytest.raises(RuntimeError, match=r"Callback validation"):
-            _create_callbacks(
-                adata_cflare,
-                _default_model_callback,
-                ["foo"],
-                ["0"],
-                perform_sanity_check=True,  # default callback disables it
-            )
-
-    def test_callback_wrong_lineage(self, adata_cflare: AnnData):
-        with pytest.raises(RuntimeError, match=r"Callback validation"):
+    @pytest.mark.parametrize(
+        ("callback", "gene", "lineage", "exc", "match"),
+        [
+            (_default_model_callback, "foo", "0", KeyError, r"Gene .* not found"),
+            (_default_model_callback, None, "foo", KeyError, r"Invalid lineage name"),
+            (_callback_not_prepared, None, "0", AssertionError, r"Model is not prepared"),
+            (_callback_modifies_gene, None, "0", AssertionError, r"modified the gene"),
+            (_callback_modifies_lineage, None, "0", AssertionError, r"modified the lineage"),
+            (_callback_raises, None, "0", TypeError, r"foobar"),
+        ],
+    )
+    def test_callback_validation_raises(
+        self,
+        adata_cflare: AnnData,
+        callback: Callable,
+        gene: Optional[str],
+        lineage: str,
+        exc: type,
+        match: str,
+    ):
+        # `None` selects the first gene, the fixture is not available during collection
+        gene = adata_cflare.var_names[0] if gene is None else gene
+        with pytest.raises(RuntimeError, match=r"Callback validation") as excinfo:
             _create_callbacks(
                 adata_cflare,
-                _default_model_callback,
-                [adata_cflare.var_names[0]],
-                ["foo"],
-                time_key="dpt_pseudotime",
+                callback,
+                [gene],
+                [lineage],
+                time_key="latent_time",
                 perform_sanity_check=True,  # default callback disables it
             )
 
-    def test_callback_does_model_not_prepare(self, adata_cflare: AnnData):
-        def cb(model: BaseModel, *_args, **_kwargs):
-            return model
-
-        with pytest.raises(RuntimeError, match=r"Callback validation"):
-            _create_callbacks(
-                adata_cflare,
-                cb,
-                [adata_cflare.var_names[0]],
-                ["0"],
-            )
-
-    def test_callback_modifies_gene(self, adata_cflare: AnnData):
-        def cb(model: BaseModel, *_args, **_kwargs):
-            model._gene = "bar"
-            return model
-
-        with pytest.raises(RuntimeError, match=r"Callback validation"):
-            _create_callbacks(
-                adata_cflare,
-                cb,
-                [adata_cflare.var_names[0]],
-                ["0"],
-            )
-
-    def test_callback_modifies_lineage(self, adata_cflare: AnnData):
-        def cb(model: BaseModel, *_args, **_kwargs):
-            model._lineage = "bar"
-            return model
-
-        with pytest.raises(RuntimeError, match=r"Callback validation"):
-            _create_callbacks(
-                adata_cflare,
-                cb,
-                [adata_cflare.var_names[0]],
-                ["0"],
-            )
-
-    def test_callback_unexpected_failure(self, adata_cflare: AnnData):
-        def cb(_model: BaseModel, *_args, **_kwargs):
-            raise TypeError("foobar")
-
-        with pytest.raises(RuntimeError, match=r"Callback validation"):
-            _create_callbacks(
-                adata_cflare,
-                cb,
-                [adata_cflare.var_names[0]],
-                ["0"],
-            )
+        cause = excinfo.value.__cause__
+        assert isinstance(cause, exc)
+        assert re.search(match, str(cause))
 
     def test_callback_lineage_and_gene_specific(self, adata_cflare: AnnData):
         def cb1(model: BaseModel, *args, **kwargs):
@@ -827,10 +851,25 @@ class TestCreateCallbacks:
         assert cbs[g]["1"] is cb2
 
 
+def _read_only_blobs(n_variables: int) -> AnnData:
+    adata = sc.datasets.blobs(n_observations=100, n_variables=n_variables)
+    adata.X.setflags(write=False)  # shared across the tests
+    return adata
+
+
+@pytest.fixture(scope="class")
+def blobs_6() -> AnnData:
+    return _read_only_blobs(n_variables=6)
+
+
+@pytest.fixture(scope="class")
+def blobs_1() -> AnnData:
+    return _read_only_blobs(n_variables=1)
+
+
 class TestClusterX:
-    def test_normal_run_leiden(self):
-        # create some data
-        adata = sc.datasets.blobs(n_observations=100, n_variables=6)
+    def test_normal_run_leiden(self, blobs_6: AnnData):
+        adata = blobs_6
 
         # kmeans, leiden
         labels_kmeans = _cluster_X(adata.X, n_clusters=5, method="kmeans")
@@ -838,9 +877,46 @@ class TestClusterX:
 
         assert len(labels_kmeans) == len(labels_leiden) == adata.n_obs
 
-    def test_one_feature(self):
-        # create some data
-        adata = sc.datasets.blobs(n_observations=100, n_variables=1)
+    def test_leiden_reuses_knn_graph(self, blobs_6: AnnData, mocker):
+        X = blobs_6.X.copy()
+        spy = mocker.spy(sc.pp, "neighbors")
+
+        conn1 = _knn_connectivities(X, n_neighbors=10)
+        conn2 = _knn_connectivities(X, n_neighbors=10)
+        assert spy.call_count == 1
+        conn3 = _knn_connectivities(X, n_neighbors=15)
+        _ = _knn_connectivities(X.copy(), n_neighbors=10)
+        assert spy.call_count == 3
+
+        assert conn1 is not conn2
+        assert conn1.nnz != conn3.nnz
+        np.testing.assert_array_equal(conn1.toarray(), conn2.toarray())
+
+        # the cached graph is not modified through the returned one
+        expected = conn1.toarray()
+        conn1.data[:] = 0
+        np.testing.assert_array_equal(_knn_connectivities(X, n_neighbors=10).toarray(), expected)
+
+        labels1 = _cluster_X(X, n_clusters=5, method="leiden", n_neighbors=10)
+        labels2 = _cluster_X(X, n_clusters=5, method="leiden", n_neighbors=10)
+        assert labels1 == labels2
+
+    def test_knn_cache_released(self, blobs_6: AnnData):
+        _clear_knn_cache()
+        X = blobs_6.X.copy()
+
+        _ = _knn_connectivities(X, n_neighbors=10)
+        assert len(_KNN_CACHE) == 1
+        _clear_knn_cache()
+        assert len(_KNN_CACHE) == 0
+
+        _ = _knn_connectivities(X, n_neighbors=10)
+        del X
+        gc.collect()
+        assert len(_KNN_CACHE) == 0
+
+    def test_one_feature(self, blobs_1: AnnData):
+        adata = blobs_1
 
         # kmeans, leiden
         labels_kmeans = _cluster_X(adata.X, n_clusters=5, method="kmeans")
@@ -850,26 +926,19 @@ class TestClusterX:
 
 
 class TestKernelUtils:
-    @pytest.mark.parametrize("fn", ["mean", "max", "sum", "norm"])
+    @pytest.mark.parametrize("order", ["C", "F"])
+    @pytest.mark.parametrize("fn", list(_NUMBA_REDUCERS))
     @pytest.mark.parametrize("axis", [0, 1])
-    def numba_function(self, fn: str, axis: int):
-        numpy_fn = getattr(np, fn)
-        numba_fn = globals()[f"np_{fn}"]
+    def test_numba_function(self, fn: str, axis: int, order: str):
+        numba_fn, numpy_fn = _NUMBA_REDUCERS[fn]
 
-        x = np.random.RandomState(42).normal(size=(10, 10))
+        x = np.asarray(np.random.RandomState(42).normal(size=(10, 7)), order=order)
 
-        np.testing.assert_allclose(numpy_fn(x, axis=axis), numba_fn(x, axis))
+        np.testing.assert_allclose(numba_fn(x, axis), numpy_fn(x, axis=axis))
 
     def test_apply_along_axis(self):
         x = np.random.RandomState(42).normal(size=(10, 10))
 
-        def _create_numba_fn(fn):
-            @nb.njit
-            def wrapped(axis: int, x: np.ndarray):
-                return _np_apply_along_axis(fn, axis, x)
-
-            return wrapped
-
         for axis in [0, 1]:
             for fn in (np.var, np.std):
                 np.testing.assert_allclose(fn(x, axis=axis), _create_numba_fn(fn)(axis, x))
@@ -879,21 +948,49 @@ class TestKernelUtils:
 
         np.testing.assert_array_equal(starts, np.arange(11))
 
+    def test_calculate_starts_subset(self):
+        indptr = sp.random(20, 20, density=0.3, format="csr", random_state=42).indptr
+        ixs = np.array([3, 0, 7, 19])
+
+        starts = _calculate_starts(indptr, ixs)
+
+        np.testing.assert_array_equal(starts, np.r_[0, np.cumsum(indptr[ixs + 1] - indptr[ixs])])
+
     @jax_not_installed_skip
     @pytest.mark.parametrize(
         ("seed", "c", "s"),
         zip(range(4), [True, True, False, False], [True, False, True, False]),
     )
     def test_numpy_and_jax(self, seed: int, c: bool, s: bool):
-        rng = np.random.default_rng(seed)
-        x = rng.normal(size=(100,))
-        w = rng.normal(size=(1, 100))
+        from cellrank.kernels.utils._similarity import _predict_transition_probabilities_jax
+
+        x = _RNG_BLOCK[seed, 0]
+        w = _RNG_BLOCK[seed, 1:].copy()  # modified in-place by the numpy implementation
 
         np_res, _ = _predict_transition_probabilities_numpy(x[None, :], w, 1, center_mean=c, scale_by_norm=s)
         jax_res = _predict_transition_probabilities_jax(x, w, 1, c, s)
 
         np.testing.assert_allclose(np_res, jax_res)
 
+    @jax_not_installed_skip
+    @pytest.mark.parametrize(("c", "s"), [(True, True), (False, False)])
+    def test_jitted_jax_hessian(self, c: bool, s: bool):
+        import jax
+
+        from cellrank.kernels.utils._similarity import (
+            _predict_transition_probabilities_jax,
+            _predict_transition_probabilities_jax_H,
+        )
+
+        rng = np.random.default_rng(42)
+        x = rng.normal(size=(10,))
+        w = rng.normal(size=(5, 10))
+
+        expected = jax.hessian(_predict_transition_probabilities_jax)(x, w, 1.0, c, s)
+        # the second call reuses the compiled function
+        for _ in range(2):
+            np.testing.assert_allclose(_predict_transition_probabilities_jax_H(x, w, 1.0, c, s), expected, rtol=1e-5)
+
     def test_random_normal_wrong_ndim(self):
         with pytest.raises(AssertionError, match=r"Means are not 1-dimensional"):
             _random_normal(np.array([[1, 2, 3]]), np.array([[1, 2, 3]]))
@@ -913,9 +1010,18 @@ class TestKernelUtils:
         assert x.shape == (1, 1)
 
 
+@pytest.fixture(scope="class")
+def small_csr() -> sp.csr_matrix:
+    # one non-zero per row, only the shape matters for the tests
+    rng = np.random.default_rng(0)
+    data = rng.random(3, dtype=np.float32)
+    indices = rng.integers(0, 100, size=3, dtype=np.int32)
+    return sp.csr_matrix((data, indices, np.arange(4, dtype=np.int32)), shape=(3, 100))
+
+
 class TestParallelize:
     @pytest.mark.parametrize("n_jobs", [1, 3, 4])
-    def test_more_jobs_than_work(self, n_jobs: int):
+    def test_more_jobs_than_work(self, small_csr: sp.csr_matrix, n_jobs: int):
         def callback(data, **_: Any):
             assert isinstance(data, sp.csr_matrix)
             assert data.shape[1] == 100
@@ -924,7 +1030,7 @@ class TestParallelize:
 
         res = parallelize(
             callback,
-            collection=sp.rand(3, 100, format="csr"),
+            collection=small_csr,
             n_jobs=n_jobs,
             show_progress_bar=False,
             extractor=np.concatenate,
@@ -932,6 +1038,38 @@ class TestParallelize:
 
         np.testing.assert_array_equal(res, 42)
 
+    @pytest.mark.parametrize(("n_jobs", "backend"), [(1, None), (2, "threading")])
+    def test_progress_queue_without_processes(self, n_jobs: int, backend: Optional[str]):
+        def callback(data, queue=None, **_: Any):
+            for _ in data:
+                queue.put(1)
+            queue.put(None)
+
+            return data
+
+        res = parallelize(
+            callback,
+            collection=np.arange(10),
+            n_jobs=n_jobs,
+            backend=backend,
+            as_array=False,
+            extractor=np.concatenate,
+        )()
+
+        np.testing.assert_array_equal(res, np.arange(10))
+
+    @pytest.mark.parametrize("nogil", [False, True])
+    def test_default_backend(self, nogil: bool, mocker):
+        @nb.njit(nogil=nogil)
+        def callback(data, queue=None):
+            return data.sum()
+
+        spy = mocker.patch.object(jl, "Parallel", wraps=jl.Parallel)
+        res = parallelize(callback, collection=np.arange(10), n_jobs=1, show_progress_bar=False)()
+
+        assert spy.call_args.kwargs["backend"] == ("threading" if nogil else "loky")
+        np.testing.assert_array_equal(res, [45])
+
 
 class TestGeneSymbolsCtxManager:
     @pytest.mark.parametrize("use_raw", [False, True])
@@ -942,28 +1080,41 @@ class TestGeneSymbolsCtxManager:
                 pass
         else:
             raw = adata.raw
-            adata_orig = adata.copy().raw.to_adata() if use_raw else adata.copy()
+            var_orig = (adata.raw.var if use_raw else adata.var).copy()
 
             with _gene_symbols_ctx(adata, key=key, use_raw=use_raw) as bdata:
                 assert adata is bdata
-                adata_mraw = adata.raw.to_adata() if use_raw else adata
-                np.testing.assert_array_equal(
-                    adata_mraw.var_names,
-                    adata_orig.var_names if key is None else adata_orig.var[key],
-                )
+                var = adata.raw.var if use_raw else adata.var
+                assert var.index.equals(var_orig.index if key is None else pd.Index(var_orig[key]))
 
             assert adata.raw is raw
-            adata_mraw = adata.raw.to_adata() if use_raw else adata
-            np.testing.assert_array_equal(adata_mraw.var_names, adata_orig.var_names)
+            var = adata.raw.var if use_raw else adata.var
+            assert var.index.equals(var_orig.index)
 
             if key is not None:
-                np.testing.assert_array_equal(adata_mraw.var[key], adata_orig.var[key])
+                assert var[key].equals(var_orig[key])
 
     def test_make_unique(self, adata: AnnData):
-        adata_orig = adata.copy()
+        var_names_orig = adata.var_names  # indices are immutable, no need to copy the whole object
         adata.var["foo"] = "bar"
 
         with _gene_symbols_ctx(adata, key="foo", make_unique=True):
-            np.testing.assert_array_equal(adata.var_names, make_index_unique(adata.var["foo"]))
+            assert adata.var_names.equals(pd.Index(make_index_unique(adata.var["foo"])))
+
+        assert adata.var_names.equals(var_names_orig)
+
+    @pytest.mark.parametrize(
+        "names",
+        [
+            ["a", "b", "c"],
+            ["a", "a", "b", "a", "b"],
+            ["a", "a", "a-1"],
+        ],
+    )
+    def test_make_index_unique_vectorized(self, names: List[str]):
+        index = pd.Index(names)
+
+        res = _make_index_unique(index)
 
-        np.testing.assert_array_equal(adata.var_names, adata_orig.var_names)
+        assert res.is_unique
+        np.testing.assert_array_equal(res, make_index_unique(index))